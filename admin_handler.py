@@ -1,15 +1,112 @@
 from typing import List, Dict, Any
 import logging
-import math
 import re
+import time
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
 from utils import AdminState
+from google_sheets_writer import GoogleSheetsWriter
 import asyncio
+from itertools import islice
+from functools import lru_cache
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 所有带整数参数的回调数据，如 admin_page_1、delete_channel_id_page_0_3
+# 正则的 \d+ 锚定保证 delete_channel 不会误匹配 delete_channel_id_3 之类的数据
+_CB_RE = re.compile(
+    r"^(?P<cmd>admin_page|delete_admin|channel_page|add_channel_page|add_channel_to_group"
+    r"|delete_channel_page|delete_channel_from_group|delete_channel_id_page|delete_channel_id"
+    r"|delete_investment_page|delete_investment_group|confirm_delete_investment"
+    r"|google_sheets_page|delete_channel)_(?P<a>\d+)(?:_(?P<b>\d+))?$"
+)
+
+# 用户ID、群组ID等整数输入（群组ID通常为负数）
+_INT_RE = re.compile(r'[+-]?\d+')
+
+# 批量输入渠道ID时的分隔符（换行或|）及行首的•符号
+_SPLIT_RE = re.compile(r'[\n|]+')
+_BULLET_RE = re.compile(r'^\s*•', re.M)
+
+# Google表格ID：字母、数字、下划线和短横线
+_SPREADSHEET_ID_RE = re.compile(r'[0-9A-Za-z_-]{20,60}')
+
+# 消息文本中的分隔线及固定的页眉模板，渲染时只需格式化页码等少量参数
+_SEP = "━━━━━━━━━━━━━━━━"
+_MAIN_MENU_TEXT = f"🔧 管理员控制面板\n{_SEP}\n请选择要执行的操作："
+# 主菜单键盘内容固定，导入时构建一次（按钮对象创建后不可变，可共享）
+_MAIN_MENU_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("新增管理员", callback_data="add_admin"),
+     InlineKeyboardButton("删除管理员", callback_data="delete_admin")],
+    [InlineKeyboardButton("新增渠道分组", callback_data="add_channel_group"),
+     InlineKeyboardButton("删除渠道分组", callback_data="delete_channel_group")],
+    [InlineKeyboardButton("新增代投组", callback_data="add_investment_group"),
+     InlineKeyboardButton("删除代投组", callback_data="delete_investment_group")],
+    [InlineKeyboardButton("配置Google表格", callback_data="config_google_sheets")],
+])
+# 各页面共用的返回主菜单按钮
+_BACK_BUTTON = InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")
+_BACK_ONLY_MARKUP = InlineKeyboardMarkup([[_BACK_BUTTON]])
+# Google表格子页面共用的返回配置菜单按钮
+_BACK_CONFIG_BUTTON = InlineKeyboardButton("🔙 返回配置菜单", callback_data="config_google_sheets")
+_BACK_CONFIG_MARKUP = InlineKeyboardMarkup([[_BACK_CONFIG_BUTTON]])
+_HDR_ADMIN_LIST = f"👥 管理员列表 (第%d/%d页)\n{_SEP}\n请选择要删除的管理员：\n\n"
+_HDR_GROUPS_PICKER = f"%s %s (第%d/%d页)\n{_SEP}\n%s\n\n"
+_HDR_CHANNEL_ID_LIST = f"🗑️ 删除群组「%s」的渠道 (第%d/%d页)\n{_SEP}\n请选择要删除的渠道ID：\n\n"
+_HDR_INVESTMENT_LIST = f"🗑️ 删除代投组 (第%d/%d页)\n{_SEP}\n请选择要删除的代投组：\n\n"
+_HDR_CHANNEL_GROUP_LIST = f"🏷️ 渠道分组列表 (第%d/%d页)\n{_SEP}\n请选择要删除的渠道分组：\n\n"
+_HDR_GOOGLE_SHEETS = (
+    f"📊 Google表格配置 (第{{page}}/{{total}}页)\n{_SEP}\n"
+    "📋 日报工作表: {daily}\n"
+    "📋 时报工作表: {hourly}\n"
+    "🔑 凭据文件: {creds}\n\n"
+    "📝 代投组表格配置:\n"
+)
+
+@lru_cache(maxsize=1024)
+def _make_group_row(group_name: str, configured: bool) -> tuple:
+    """Google表格配置菜单中单个群组的按钮行，按 (群组名称, 是否已配置) 缓存"""
+    if not configured:
+        return (InlineKeyboardButton(f"📝 配置 {group_name}", callback_data=f"set_spreadsheet_{group_name}"),)
+    return (
+        InlineKeyboardButton(f"🔄 更新 {group_name}", callback_data=f"set_spreadsheet_{group_name}"),
+        InlineKeyboardButton(f"🗑️ 删除 {group_name}", callback_data=f"remove_spreadsheet_{group_name}"),
+    )
+
+class _IndexedGroupView:
+    """群组配置的按索引访问视图
+    
+    只保存一份群组名称列表，按页切片时才取出对应的 (群组名称, 群组配置)，
+    避免每次渲染都把整个配置字典转换成列表。
+    """
+    __slots__ = ("_groups", "_keys")
+    
+    def __init__(self, groups: Dict[str, Any]):
+        self._groups = groups
+        self._keys = list(groups)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [(key, self._groups[key]) for key in self._keys[index]]
+        return self.get(index)
+    
+    def __iter__(self):
+        groups = self._groups
+        return ((key, groups[key]) for key in self._keys)
+    
+    def get(self, index: int) -> tuple:
+        """获取第 index 个 (群组名称, 群组配置)"""
+        key = self._keys[index]
+        return key, self._groups[key]
+    
+    def slice(self, start: int, end: int) -> list:
+        """获取 [start, end) 范围内的 (群组名称, 群组配置) 列表"""
+        return self[start:end]
+
 class AdminHandler:
     def __init__(self, config_loader, admin_state: AdminState, user_command_handler=None, api_data_sender_manager=None):
         """初始化管理员处理器"""
@@ -17,24 +114,230 @@ class AdminHandler:
         self.admin_state = admin_state
         self.user_command_handler = user_command_handler
         self.api_data_sender_manager = api_data_sender_manager
-        self.admins = config_loader.get_admins()
+        self._load_admins()
         self.items_per_page = 15  # 每页显示15条数据
+        # 群组配置的索引视图，翻页时直接复用，配置变更时失效
+        self._groups_view = None
+        # 预先渲染好的列表页 [(text, reply_markup), ...]，配置变更时失效
+        self._investment_delete_pages = None
+        self._channel_group_pages = None
+        # 配置版本号，每次配置变更加一；Google表格菜单数据按版本号缓存
+        self._config_version = 0
+        self._gs_cache = None
+        # 延迟返回主菜单等后台任务的引用
+        self._background_tasks = set()
+        # 每条消息（或聊天）待执行的返回主菜单任务，用于合并重复调度
+        self._pending_returns = {}
+        # 串行化配置文件重载，短时间内的重复重载直接复用上一次的结果
+        self._reload_lock = asyncio.Lock()
+        self._last_reload_monotonic = float("-inf")
+        # 串行化所有配置文件写入和重新加载（见 _run_config_write / _run_config_io），避免并发修改互相覆盖或读到写了一半的文件
+        self._config_write_lock = asyncio.Lock()
+        
+        # 回调分发表：精确匹配的命令 → 处理函数（None 表示空操作）
+        self._exact_handlers = {
+            "add_admin": self._handle_add_admin_request,
+            "delete_admin": self._handle_delete_admin_request,
+            "add_channel_group": self._handle_add_channel_group_request,
+            "delete_channel_group": self._handle_delete_channel_group_request,
+            "add_investment_group": self._handle_add_investment_group_request,
+            "delete_investment_group": self._handle_delete_investment_group_request,
+            "back_to_main": self._back_to_main_menu_from_query,
+            "config_google_sheets": self._handle_config_google_sheets_request,
+            "noop": None,
+        }
+        
+        # 回调分发表：带整数参数的命令名（对应 _CB_RE 的 cmd 分组）→ 处理函数
+        self._int_arg_handlers = {
+            "admin_page": self._show_admin_list,
+            "delete_admin": self._confirm_delete_admin,
+            "channel_page": self._show_channel_group_list,
+            "add_channel_page": self._show_groups_for_channel_addition,
+            "add_channel_to_group": self._handle_add_channel_to_group,
+            "delete_channel_page": self._show_groups_for_channel_deletion,
+            "delete_channel_from_group": self._handle_delete_channel_from_group,
+            "delete_channel_id_page": self._show_channel_ids_for_deletion,
+            "delete_channel_id": self._confirm_delete_channel_id,
+            "delete_investment_page": self._show_investment_groups_for_deletion,
+            "delete_investment_group": self._confirm_delete_investment_group,
+            "confirm_delete_investment": self._execute_delete_investment_group,
+            "google_sheets_page": self._handle_config_google_sheets_request,
+            # 旧版渠道分组删除（兼容性）
+            "delete_channel": self._confirm_delete_channel_group,
+        }
+        
+        # 文本输入分发表：等待输入的状态名称 → (日志描述, 处理函数)
+        self._input_handlers = {
+            "waiting_for_add_admin_id": ("新增管理员ID", self._handle_add_admin_id_input),
+            "waiting_for_new_channel_group_name": ("渠道名称", self._handle_channel_group_name_input),
+            "waiting_for_channel_group_id": ("渠道群组ID", self._handle_channel_group_id_input),
+            "waiting_for_new_channel_id": ("新渠道ID", self._handle_new_channel_id_input),
+            "waiting_for_delete_channel_ids": ("删除渠道ID", self._handle_delete_channel_ids_input),
+            "waiting_for_new_investment_group_name": ("新代投组名称", self._handle_new_investment_group_name_input),
+            "waiting_for_new_investment_group_id": ("新代投组群组ID", self._handle_new_investment_group_id_input),
+            "waiting_for_spreadsheet_id": ("表格ID", self._handle_spreadsheet_id_input),
+        }
+        
+        # 回调分发表：带字符串参数的命令 (前缀, 处理函数)，前缀之后的部分即为参数（群组名称）
+        self._prefix_handlers = {
+            "set_spreadsheet_": self._handle_set_spreadsheet_request,
+            "remove_spreadsheet_": self._handle_remove_spreadsheet_request,
+        }
+        self._str_prefixes = tuple(self._prefix_handlers)
+        
+        # 所有带参数回调的前缀，先用一次 startswith 过滤掉未知数据
+        self._callback_prefixes = tuple(f"{cmd}_" for cmd in self._int_arg_handlers) + self._str_prefixes
     
     def is_admin(self, user_id: int) -> bool:
+        # 检查用户ID是否在管理员集合中
+        return user_id in self._admins_set
+    
+    def _load_admins(self) -> None:
+        """从配置加载管理员列表，并构建用于权限检查的集合"""
+        self.admins = self.config_loader.get_admins()
         # 确保管理员列表是整数列表
-        if not isinstance(self.admins, list):
-            logger.error(f"管理员列表不是列表类型: {type(self.admins)}")
-            return False
-            
-        # 检查用户ID是否在管理员列表中
-        is_admin = user_id in self.admins
-        logger.info(f"用户 {user_id} 是否为管理员: {is_admin}")
-        return is_admin
+        if isinstance(self.admins, list):
+            self._admins_set = frozenset(self.admins)
+        else:
+            logger.error("管理员列表不是列表类型: %s", type(self.admins))
+            self._admins_set = frozenset()
     
     def update_config(self, config_loader) -> None:
         """更新配置加载器"""
         self.config_loader = config_loader
-        self.admins = config_loader.get_admins()
+        self._load_admins()
+        self._invalidate_config_cache()
+    
+    def _get_groups_view(self) -> "_IndexedGroupView":
+        """获取群组配置的索引视图，缓存到配置变更为止"""
+        if self._groups_view is None:
+            self._groups_view = _IndexedGroupView(self.config_loader.get_groups_config())
+        return self._groups_view
+    
+    def _paginate(self, items, page: int) -> tuple:
+        """分页切片，items 需支持 len() 和切片（列表或 _IndexedGroupView）
+        
+        Returns:
+            (当前页数据, 当前页起始索引, 总页数)
+        """
+        per_page = self.items_per_page
+        total_pages = (len(items) + per_page - 1) // per_page
+        start_index = page * per_page
+        return items[start_index:start_index + per_page], start_index, total_pages
+    
+    def _build_list_pages(self, items, header_template: str, build_button, page_cb_prefix: str) -> list:
+        """一次性渲染列表的所有分页
+        
+        Args:
+            items: 列表数据，需支持 len() 和迭代（如 dict.items()）
+            header_template: 页眉模板，按 (当前页, 总页数) 格式化
+            build_button: 根据 (全局索引, 数据项) 构建按钮的函数
+            page_cb_prefix: 翻页按钮的回调数据前缀，后接页码
+            
+        Returns:
+            [(text, reply_markup), ...]，按页码排列
+        """
+        pages = []
+        per_page = self.items_per_page
+        total_pages = (len(items) + per_page - 1) // per_page
+        # 单次遍历按页取出数据，字典视图也无需先转换成列表
+        indexed_items = enumerate(items)
+        for page in range(total_pages):
+            keyboard = [[build_button(i, item)] for i, item in islice(indexed_items, per_page)]
+            
+            # 添加分页按钮
+            if total_pages > 1:
+                page_buttons = []
+                if page > 0:
+                    page_buttons.append(InlineKeyboardButton("⬅️ 上一页", callback_data=f"{page_cb_prefix}{page - 1}"))
+                if page < total_pages - 1:
+                    page_buttons.append(InlineKeyboardButton("➡️ 下一页", callback_data=f"{page_cb_prefix}{page + 1}"))
+                keyboard.append(page_buttons)
+            
+            # 添加返回按钮
+            keyboard.append([_BACK_BUTTON])
+            
+            pages.append((header_template % (page + 1, total_pages), InlineKeyboardMarkup(keyboard)))
+        return pages
+    
+    @staticmethod
+    async def _edit_if_changed(query, text: str, reply_markup=None) -> bool:
+        """仅在内容变化时编辑消息
+        
+        重复点击翻页按钮等场景下新内容与当前消息相同，Telegram 会返回
+        "Message is not modified" 错误，此时直接跳过这次请求。
+        
+        Returns:
+            是否实际发送了编辑请求
+        """
+        message = query.message
+        # Telegram 会去掉消息首尾的空白字符，比较时同样处理
+        if (message is not None and message.text == text.strip()
+                and message.reply_markup == reply_markup):
+            return False
+        await query.edit_message_text(text, reply_markup=reply_markup)
+        return True
+    
+    def _invalidate_config_cache(self) -> None:
+        """配置变更后清空缓存的配置快照"""
+        self._groups_view = None
+        self._investment_delete_pages = None
+        self._channel_group_pages = None
+        self._config_version += 1
+    
+    async def _run_config_io(self, func, *args):
+        """在线程池中执行会读取配置文件的 ConfigLoader 方法（如 reload_config）
+        
+        与配置写入共用 _config_write_lock 串行执行，避免重新加载时读到写了一半的文件。
+        """
+        async with self._config_write_lock:
+            return await asyncio.to_thread(func, *args)
+    
+    async def _run_config_write(self, func, *args, failed=False):
+        """执行修改配置的 ConfigLoader 方法
+        
+        内存中的配置在事件循环中修改，不会与遍历配置的代码交错；
+        只有写文件放到线程池中，并与其他写入、重新加载共用 _config_write_lock 串行执行。
+        
+        Args:
+            func: ConfigLoader 的修改方法
+            failed: 写文件失败时返回的值（与 func 失败时的返回值一致）
+        """
+        loader = self.config_loader
+        async with self._config_write_lock:
+            with loader.defer_save():
+                result = func(*args)
+            data = loader.take_pending_save()
+            if data is not None:
+                try:
+                    await asyncio.to_thread(loader.write_config_data, data)
+                except Exception as e:
+                    logger.error("写入配置文件失败: %s", e)
+                    return failed
+        return result
+    
+    def _get_google_sheets_menu_data(self) -> tuple:
+        """获取Google表格菜单所需的数据，按配置版本号缓存
+        
+        Returns:
+            ((群组名称, 群组配置, 表格ID或"未配置"), ...), 页眉模板 _HDR_GOOGLE_SHEETS 的工作表参数
+        """
+        cache = self._gs_cache
+        if cache is None or cache[0] != self._config_version:
+            google_sheets_config = self.config_loader.get_google_sheets_config()
+            group_spreadsheets = google_sheets_config.get('group_spreadsheets', {})
+            
+            group_items = tuple(
+                (group_name, group_config, group_spreadsheets.get(group_name, "未配置"))
+                for group_name, group_config in self.config_loader.get_groups_ordered()
+            )
+            header_fields = {
+                'daily': google_sheets_config.get('daily_sheet_name', 'Daily-Report'),
+                'hourly': google_sheets_config.get('hourly_sheet_name', 'Hourly-Report'),
+                'creds': google_sheets_config.get('credentials_file', 'credentials.json'),
+            }
+            cache = self._gs_cache = (self._config_version, group_items, header_fields)
+        return cache[1], cache[2]
     
     async def handle_start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """处理 /start 命令"""
@@ -47,26 +350,17 @@ class AdminHandler:
             await message.reply_text("Hello")
             return
         
-        # 创建管理员键盘
-        keyboard = [
-            [InlineKeyboardButton("新增管理员", callback_data="add_admin"),
-             InlineKeyboardButton("删除管理员", callback_data="delete_admin")],
-            [InlineKeyboardButton("新增渠道分组", callback_data="add_channel_group"),
-             InlineKeyboardButton("删除渠道分组", callback_data="delete_channel_group")],
-            [InlineKeyboardButton("新增代投组", callback_data="add_investment_group"),
-             InlineKeyboardButton("删除代投组", callback_data="delete_investment_group")],
-            [InlineKeyboardButton("配置Google表格", callback_data="config_google_sheets")],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # 管理员键盘
+        reply_markup = _MAIN_MENU_MARKUP
         
         try:
             await message.reply_text(
-                "🔧 管理员控制面板\n━━━━━━━━━━━━━━━━\n请选择要执行的操作：",
+                _MAIN_MENU_TEXT,
                 reply_markup=reply_markup
             )
             logger.info("管理员控制面板已发送")
         except Exception as e:
-            logger.error(f"发送管理员控制面板失败: {str(e)}", exc_info=True)
+            logger.error("发送管理员控制面板失败: %s", e, exc_info=True)
             await message.reply_text("❌ 发送控制面板失败")
 
     async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -74,7 +368,7 @@ class AdminHandler:
         query = update.callback_query
         # 注释掉未定义的ppprint函数调用
         # ppprint(f"Received callback_data: {query.data}")
-        logger.info(f"Received callback_data: {query.data}")
+        logger.info("Received callback_data: %s", query.data)
         try:
             # 先应答回调查询，避免按钮显示loading状态
             await query.answer()
@@ -90,179 +384,84 @@ class AdminHandler:
                 return
             
             user_id = update.effective_user.id
-            logger.info(f"用户ID: {user_id}")
             
             if not self.is_admin(user_id):
-                logger.warning(f"用户 {user_id} 不是管理员")
+                logger.warning("用户 %s 不是管理员", user_id)
                 await query.edit_message_text("❌ 您没有权限执行此操作")
                 return
             
             data = query.data
-            logger.info(f"处理回调查询数据: {data}")
-            
-            # 处理主菜单选项
-            if data == "add_admin":
-                logger.info("处理新增管理员请求")
-                await self._handle_add_admin_request(query)
-            elif data == "delete_admin":
-                logger.info("处理删除管理员请求")
-                await self._handle_delete_admin_request(query)
-            elif data == "add_channel_group":
-                logger.info("处理新增渠道分组请求")
-                await self._handle_add_channel_group_request(query)
-            elif data == "delete_channel_group":
-                logger.info("处理删除渠道分组请求")
-                await self._handle_delete_channel_group_request(query)
-            elif data == "add_investment_group":
-                logger.info("处理新增代投组请求")
-                await self._handle_add_investment_group_request(query)
-            elif data == "delete_investment_group":
-                logger.info("处理删除代投组请求")
-                await self._handle_delete_investment_group_request(query)
-            elif data == "back_to_main":
-                logger.info("返回主菜单")
-                await self._back_to_main_menu(query)
-            elif data == "noop":
-                # 空操作，用于禁用的按钮
-                pass
-            
-            # 处理管理员列表分页
-            elif data.startswith("admin_page_"):
-                page = int(data.split("_")[2])
-                logger.info(f"显示管理员列表第 {page + 1} 页")
-                await self._show_admin_list(query, page)
-            elif data.startswith("delete_admin_"):
-                admin_index = int(data.split("_")[2])
-                logger.info(f"确认删除管理员索引: {admin_index}")
-                await self._confirm_delete_admin(query, admin_index)
-            
-            # 处理渠道分组列表分页
-            elif data.startswith("channel_page_"):
-                page = int(data.split("_")[2])
-                logger.info(f"显示渠道分组列表第 {page + 1} 页")
-                await self._show_channel_group_list(query, page)
-            
-            # 处理群组选择分页（添加渠道）
-            elif data.startswith("add_channel_page_"):
-                page = int(data.split("_")[3])
-                logger.info(f"显示添加渠道群组列表第 {page + 1} 页")
-                await self._show_groups_for_channel_addition(query, page)
-            elif data.startswith("add_channel_to_group_"):
-                group_index = int(data.split("_")[4])
-                logger.info(f"选择群组添加渠道索引: {group_index}")
-                await self._handle_add_channel_to_group(query, group_index)
-            
-            # 处理群组选择分页（删除渠道）
-            elif data.startswith("delete_channel_page_"):
-                page = int(data.split("_")[3])
-                logger.info(f"显示删除渠道群组列表第 {page + 1} 页")
-                await self._show_groups_for_channel_deletion(query, page)
-            elif data.startswith("delete_channel_from_group_"):
-                logger.info(f"收到删除渠道回调数据: {data}")
-                parts = data.split("_")
-                logger.info(f"回调数据分割结果: {parts}")
-                
-                # 查找最后一个数字作为group_index
-                group_index = None
-                for part in reversed(parts):
-                    try:
-                        group_index = int(part)
-                        break
-                    except ValueError:
-                        continue
-                
-                if group_index is None:
-                    logger.error(f"无法从回调数据中解析群组索引: {data}")
-                    await query.edit_message_text("❌ 无效的回调数据")
+            
+            # 精确匹配的命令
+            if data in self._exact_handlers:
+                handler = self._exact_handlers[data]
+                if handler is None:
+                    # 空操作，用于禁用的按钮
+                    return
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("分发回调 %s -> %s", data, handler.__name__)
+                await handler(query)
+                return
+            
+            if data.startswith(self._callback_prefixes):
+                # 带整数参数的命令：一次正则匹配完成命令识别和参数解析
+                match = _CB_RE.match(data)
+                if match:
+                    handler = self._int_arg_handlers[match.group("cmd")]
+                    args = [int(match.group("a"))]
+                    if match.group("b") is not None:
+                        args.append(int(match.group("b")))
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("分发回调 %s -> %s%s", data, handler.__name__, tuple(args))
+                    await handler(query, *args)
                     return
                 
-                logger.info(f"选择群组删除渠道索引: {group_index}")
-                await self._handle_delete_channel_from_group(query, group_index)
-            
-            # 处理渠道ID选择分页（删除渠道）
-            elif data.startswith("delete_channel_id_page_"):
-                parts = data.split("_")
-                page = int(parts[3])
-                group_index = int(parts[4])
-                logger.info(f"显示删除渠道ID列表第 {page + 1} 页，群组索引: {group_index}")
-                await self._show_channel_ids_for_deletion(query, page, group_index)
-            elif data.startswith("delete_channel_id_"):
-                channel_id_index = int(data.split("_")[3])
-                logger.info(f"确认删除渠道ID索引: {channel_id_index}")
-                await self._confirm_delete_channel_id(query, channel_id_index)
-            
-            # 处理代投组选择分页（删除代投组）
-            elif data.startswith("delete_investment_page_"):
-                page = int(data.split("_")[3])
-                logger.info(f"显示删除代投组列表第 {page + 1} 页")
-                await self._show_investment_groups_for_deletion(query, page)
-            elif data.startswith("delete_investment_group_"):
-                group_index = int(data.split("_")[3])
-                logger.info(f"确认删除代投组索引: {group_index}")
-                await self._confirm_delete_investment_group(query, group_index)
-            elif data.startswith("confirm_delete_investment_"):
-                group_index = int(data.split("_")[3])
-                logger.info(f"执行删除代投组索引: {group_index}")
-                await self._execute_delete_investment_group(query, group_index)
-            
-            # 处理Google表格配置
-            elif data == "config_google_sheets":
-                logger.info("处理Google表格配置请求")
-                await self._handle_config_google_sheets_request(query)
-            elif data.startswith("google_sheets_page_"):
-                page = int(data.split("_")[3])
-                logger.info(f"显示Google表格配置第 {page + 1} 页")
-                await self._handle_config_google_sheets_request(query, page)
-            elif data.startswith("set_spreadsheet_"):
-                group_name = data.split("_", 2)[2]  # 获取群组名称
-                logger.info(f"设置群组 {group_name} 的表格ID")
-                await self._handle_set_spreadsheet_request(query, group_name)
-            elif data.startswith("remove_spreadsheet_"):
-                group_name = data.split("_", 2)[2]  # 获取群组名称
-                logger.info(f"删除群组 {group_name} 的表格ID")
-                await self._handle_remove_spreadsheet_request(query, group_name)
-            
-            # 处理旧版渠道分组删除（兼容性）
-            elif data.startswith("delete_channel_"):
-                channel_index = int(data.split("_")[2])
-                logger.info(f"确认删除渠道分组索引: {channel_index}")
-                await self._confirm_delete_channel_group(query, channel_index)
-            else:
-                logger.warning(f"未知的回调查询数据: {data}")
-                await query.edit_message_text("❌ 未知的操作")
+                # 带字符串参数的前缀命令
+                if data.startswith(self._str_prefixes):
+                    prefix = next(p for p in self._str_prefixes if data.startswith(p))
+                    handler = self._prefix_handlers[prefix]
+                    arg = data[len(prefix):]
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("分发回调 %s -> %s(%r)", data, handler.__name__, arg)
+                    await handler(query, arg)
+                    return
+            
+            logger.warning("未知的回调查询数据: %s", data)
+            await query.edit_message_text("❌ 未知的操作")
                 
         except Exception as e:
-            logger.error(f"处理回调查询时出错: {str(e)}", exc_info=True)
-            try:
-                await query.edit_message_text(f"❌ 处理操作时出错: {str(e)}")
-            except Exception as inner_e:
-                logger.error(f"发送错误消息失败: {str(inner_e)}")
-                # 如果编辑消息失败，尝试发送新消息
+            logger.error("处理回调查询时出错: %s", e, exc_info=True)
+            error_text = f"❌ 处理操作时出错: {str(e)}"
+            # 优先编辑原消息；编辑失败且有原消息时改为发送新消息
+            senders = [query.edit_message_text]
+            if query.message:
+                senders.append(query.message.reply_text)
+            for send in senders:
                 try:
-                    await query.message.reply_text(f"❌ 处理操作时出错: {str(e)}")
-                except:
-                    pass
+                    await send(error_text)
+                    break
+                except Exception as inner_e:
+                    logger.error("发送错误消息失败: %s", inner_e)
     
     async def _handle_add_admin_request(self, query) -> None:
         """处理新增管理员请求"""
         try:
             user_id = query.from_user.id
-            logger.info(f"设置用户 {user_id} 等待输入新管理员ID")
+            logger.info("设置用户 %s 等待输入新管理员ID", user_id)
             
             # 设置状态
             self.admin_state.set_waiting_for_add_admin_id(user_id)
             
-            keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = _BACK_ONLY_MARKUP
             
             await query.edit_message_text(
-                "👤 新增管理员\n━━━━━━━━━━━━━━━━\n请输入新管理员的用户ID：",
+                f"👤 新增管理员\n{_SEP}\n请输入新管理员的用户ID：",
                 reply_markup=reply_markup
             )
             logger.info("新增管理员界面已显示")
             
         except Exception as e:
-            logger.error(f"处理新增管理员请求失败: {str(e)}", exc_info=True)
+            logger.error("处理新增管理员请求失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示新增管理员界面失败: {str(e)}")
     
     async def _handle_delete_admin_request(self, query) -> None:
@@ -270,50 +469,40 @@ class AdminHandler:
         try:
             await self._show_admin_list(query, 0)
         except Exception as e:
-            logger.error(f"显示管理员列表失败: {str(e)}", exc_info=True)
+            logger.error("显示管理员列表失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示管理员列表失败: {str(e)}")
     
     async def _show_admin_list(self, query, page: int = 0) -> None:
         """显示管理员列表"""
         try:
-            user_id = query.from_user.id
-            admin_list = self.config_loader.get_admins()
+            admin_list = self.admins
             
             if not admin_list:
-                keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(
+                await self._edit_if_changed(
+                    query,
                     "❌ 当前没有管理员",
-                    reply_markup=reply_markup
+                    reply_markup=_BACK_ONLY_MARKUP
                 )
                 return
                 
             # 设置状态
+            user_id = query.from_user.id
             self.admin_state.set_admin_list_selection(user_id, admin_list, page)
             
             # 计算分页
-            total_items = len(admin_list)
-            total_pages = math.ceil(total_items / self.items_per_page)
-            start_index = page * self.items_per_page
-            end_index = min(start_index + self.items_per_page, total_items)
+            page_items, start_index, total_pages = self._paginate(admin_list, page)
             
             # 构建消息文本
-            text = f"👥 管理员列表 (第{page + 1}/{total_pages}页)\n━━━━━━━━━━━━━━━━\n"
-            text += "请选择要删除的管理员：\n\n"
+            text = _HDR_ADMIN_LIST % (page + 1, total_pages)
             
             # 构建键盘
-            keyboard = []
-            for i in range(start_index, end_index):
-                admin_id = admin_list[i]
-                # 检查是否是当前用户
-                status = " (当前用户)" if admin_id == user_id else ""
-                button_text = f"{i + 1}. {admin_id}{status}"
-                
-                # 当前用户不能删除自己
-                if admin_id != user_id:
-                    keyboard.append([InlineKeyboardButton(button_text, callback_data=f"delete_admin_{i}")])
-                else:
-                    keyboard.append([InlineKeyboardButton(f"🚫 {button_text}", callback_data="noop")])
+            # 当前用户不能删除自己，显示为禁用按钮
+            keyboard = [
+                [InlineKeyboardButton(f"{i + 1}. {admin_id}", callback_data=f"delete_admin_{i}")]
+                if admin_id != user_id else
+                [InlineKeyboardButton(f"🚫 {i + 1}. {admin_id} (当前用户)", callback_data="noop")]
+                for i, admin_id in enumerate(page_items, start=start_index)
+            ]
             
             # 添加分页按钮
             if total_pages > 1:
@@ -326,13 +515,13 @@ class AdminHandler:
                     keyboard.append(page_buttons)
             
             # 添加返回按钮
-            keyboard.append([InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")])
+            keyboard.append([_BACK_BUTTON])
             
             reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
+            await self._edit_if_changed(query, text, reply_markup=reply_markup)
             
         except Exception as e:
-            logger.error(f"显示管理员列表失败: {str(e)}", exc_info=True)
+            logger.error("显示管理员列表失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示管理员列表失败: {str(e)}")
     
     async def _confirm_delete_admin(self, query, admin_index: int) -> None:
@@ -359,24 +548,26 @@ class AdminHandler:
                 return
                 
             # 执行删除
-            if self.config_loader.remove_admin(admin_to_delete):
-                await query.edit_message_text(f"✅ 已成功删除管理员 {admin_to_delete}")
-                
-                # 重新加载配置
-                await self._reload_config(query)
+            if await self._run_config_write(self.config_loader.remove_admin, admin_to_delete):
+                self._invalidate_config_cache()
+                # 编辑提示消息与重新加载配置互不依赖，并发执行
+                results = await asyncio.gather(
+                    query.edit_message_text(f"✅ 已成功删除管理员 {admin_to_delete}"),
+                    self._reload_config(query.message),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        raise result
                 
                 # 延迟后返回主菜单
-                await asyncio.sleep(2)
-                await self._back_to_main_menu(query)
+                self._schedule_back_to_main(query, 2.0)
             else:
-                await query.edit_message_text(f"❌ 删除管理员 {admin_to_delete} 失败")
-                
-                # 延迟后返回主菜单
-                await asyncio.sleep(2)
-                await self._back_to_main_menu(query)
+                # 提示失败并稍后返回主菜单
+                await self._edit_and_return(query, f"❌ 删除管理员 {admin_to_delete} 失败")
                 
         except Exception as e:
-            logger.error(f"删除管理员失败: {str(e)}", exc_info=True)
+            logger.error("删除管理员失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 删除管理员失败: {str(e)}")
     
     async def _handle_add_channel_group_request(self, query) -> None:
@@ -384,7 +575,7 @@ class AdminHandler:
         try:
             await self._show_groups_for_channel_addition(query, 0)
         except Exception as e:
-            logger.error(f"处理新增渠道分组请求失败: {str(e)}", exc_info=True)
+            logger.error("处理新增渠道分组请求失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示群组列表失败: {str(e)}")
 
     async def _handle_delete_channel_group_request(self, query) -> None:
@@ -392,141 +583,95 @@ class AdminHandler:
         try:
             await self._show_groups_for_channel_deletion(query, 0)
         except Exception as e:
-            logger.error(f"显示群组列表失败: {str(e)}", exc_info=True)
+            logger.error("显示群组列表失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示群组列表失败: {str(e)}")
     
     async def _show_groups_for_channel_addition(self, query, page: int = 0) -> None:
         """显示群组列表供用户选择添加渠道"""
-        try:
-            groups_config = self.config_loader.get_groups_config()
-            
-            if not groups_config:
-                keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(
-                    "❌ 当前没有群组配置",
-                    reply_markup=reply_markup
-                )
-                return
-            
-            # 转换为列表以便分页
-            group_items = list(groups_config.items())
-            
-            # 计算分页
-            total_items = len(group_items)
-            total_pages = math.ceil(total_items / self.items_per_page)
-            start_index = page * self.items_per_page
-            end_index = min(start_index + self.items_per_page, total_items)
-            
-            # 构建消息文本
-            text = f"🏷️ 选择群组添加渠道 (第{page + 1}/{total_pages}页)\n━━━━━━━━━━━━━━━━\n"
-            text += "请选择要添加渠道的群组：\n\n"
-            
-            # 构建键盘
-            keyboard = []
-            for i in range(start_index, end_index):
-                group_name, group_config = group_items[i]
-                group_display_name = group_config.get('name', group_name)
-                button_text = f"{i + 1}. {group_display_name}"
-                keyboard.append([InlineKeyboardButton(button_text, callback_data=f"add_channel_to_group_{i}")])
-            
-            # 添加分页按钮
-            if total_pages > 1:
-                page_buttons = []
-                if page > 0:
-                    page_buttons.append(InlineKeyboardButton("⬅️ 上一页", callback_data=f"add_channel_page_{page - 1}"))
-                if page < total_pages - 1:
-                    page_buttons.append(InlineKeyboardButton("➡️ 下一页", callback_data=f"add_channel_page_{page + 1}"))
-                if page_buttons:
-                    keyboard.append(page_buttons)
-            
-            # 添加返回按钮
-            keyboard.append([InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
-            
-        except Exception as e:
-            logger.error(f"显示群组列表失败: {str(e)}", exc_info=True)
-            await query.edit_message_text(f"❌ 显示群组列表失败: {str(e)}")
+        await self._show_groups_picker(query, page, "选择群组添加渠道", "🏷️", "请选择要添加渠道的群组：",
+                                      "add_channel_to_group_", "add_channel_page_")
     
     async def _show_groups_for_channel_deletion(self, query, page: int = 0) -> None:
         """显示群组列表供用户选择删除渠道"""
+        await self._show_groups_picker(query, page, "选择群组删除渠道", "🗑️", "请选择要删除渠道的群组：",
+                                      "delete_channel_from_group_", "delete_channel_page_")
+    
+    async def _show_groups_picker(self, query, page: int, title: str, icon: str, prompt: str,
+                                  item_cb_prefix: str, page_cb_prefix: str) -> None:
+        """显示分页的群组选择列表
+        
+        Args:
+            query: 回调查询
+            page: 页码（从0开始）
+            title: 列表标题，如"选择群组添加渠道"
+            icon: 标题前的图标
+            prompt: 标题下方的提示语
+            item_cb_prefix: 群组按钮的回调数据前缀，后接群组全局索引
+            page_cb_prefix: 翻页按钮的回调数据前缀，后接页码
+        """
         try:
-            groups_config = self.config_loader.get_groups_config()
+            groups_view = self._get_groups_view()
             
-            if not groups_config:
-                keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(
+            if not groups_view:
+                await self._edit_if_changed(
+                    query,
                     "❌ 当前没有群组配置",
-                    reply_markup=reply_markup
+                    reply_markup=_BACK_ONLY_MARKUP
                 )
                 return
             
-            # 转换为列表以便分页
-            group_items = list(groups_config.items())
-            
             # 计算分页
-            total_items = len(group_items)
-            total_pages = math.ceil(total_items / self.items_per_page)
-            start_index = page * self.items_per_page
-            end_index = min(start_index + self.items_per_page, total_items)
+            page_items, start_index, total_pages = self._paginate(groups_view, page)
             
             # 构建消息文本
-            text = f"🗑️ 选择群组删除渠道 (第{page + 1}/{total_pages}页)\n━━━━━━━━━━━━━━━━\n"
-            text += "请选择要删除渠道的群组：\n\n"
+            text = _HDR_GROUPS_PICKER % (icon, title, page + 1, total_pages, prompt)
             
             # 构建键盘
-            keyboard = []
-            for i in range(start_index, end_index):
-                group_name, group_config = group_items[i]
-                group_display_name = group_config.get('name', group_name)
-                button_text = f"{i - start_index + 1}. {group_display_name}"
-                keyboard.append([InlineKeyboardButton(button_text, callback_data=f"delete_channel_from_group_{i}")])
+            keyboard = [
+                [InlineKeyboardButton(f"{i + 1}. {group_config.get('name', group_name)}", callback_data=f"{item_cb_prefix}{i}")]
+                for i, (group_name, group_config) in enumerate(page_items, start=start_index)
+            ]
             
             # 添加分页按钮
             if total_pages > 1:
                 page_buttons = []
                 if page > 0:
-                    page_buttons.append(InlineKeyboardButton("⬅️ 上一页", callback_data=f"delete_channel_page_{page - 1}"))
+                    page_buttons.append(InlineKeyboardButton("⬅️ 上一页", callback_data=f"{page_cb_prefix}{page - 1}"))
                 if page < total_pages - 1:
-                    page_buttons.append(InlineKeyboardButton("➡️ 下一页", callback_data=f"delete_channel_page_{page + 1}"))
+                    page_buttons.append(InlineKeyboardButton("➡️ 下一页", callback_data=f"{page_cb_prefix}{page + 1}"))
                 if page_buttons:
                     keyboard.append(page_buttons)
             
             # 添加返回按钮
-            keyboard.append([InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")])
+            keyboard.append([_BACK_BUTTON])
             
             reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
+            await self._edit_if_changed(query, text, reply_markup=reply_markup)
             
         except Exception as e:
-            logger.error(f"显示群组列表失败: {str(e)}", exc_info=True)
+            logger.error("显示群组列表失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示群组列表失败: {str(e)}")
     
     async def _handle_add_channel_to_group(self, query, group_index: int) -> None:
         """处理选择群组添加渠道"""
         try:
-            groups_config = self.config_loader.get_groups_config()
-            group_items = list(groups_config.items())
+            groups_view = self._get_groups_view()
             
-            if group_index < 0 or group_index >= len(group_items):
+            if group_index < 0 or group_index >= len(groups_view):
                 await query.edit_message_text("❌ 无效的群组索引")
                 return
             
-            group_name, group_config = group_items[group_index]
+            group_name, group_config = groups_view.get(group_index)
             group_display_name = group_config.get('name', group_name)
             
             # 设置状态等待输入新渠道ID
             user_id = query.from_user.id
             self.admin_state.set_waiting_for_new_channel_id(user_id, group_name)
             
-            keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = _BACK_ONLY_MARKUP
             
             await query.edit_message_text(
-                f"📝 为群组「{group_display_name}」添加渠道\n━━━━━━━━━━━━━━━━\n"
+                f"📝 为群组「{group_display_name}」添加渠道\n{_SEP}\n"
                 f"请输入新的渠道ID（如：FBA8-18）：\n\n"
                 f"💡 支持批量添加，用换行或|分隔多个渠道ID\n"
                 f"例如：\nFBA8-18\nFBWX-77\nFBNYC-103\n\n"
@@ -535,26 +680,24 @@ class AdminHandler:
             )
             
         except Exception as e:
-            logger.error(f"处理选择群组添加渠道失败: {str(e)}", exc_info=True)
+            logger.error("处理选择群组添加渠道失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 处理选择群组失败: {str(e)}")
 
     async def _handle_delete_channel_from_group(self, query, group_index: int) -> None:
         """处理选择群组删除渠道"""
         try:
-            groups_config = self.config_loader.get_groups_config()
-            group_items = list(groups_config.items())
+            groups_view = self._get_groups_view()
             
-            if group_index < 0 or group_index >= len(group_items):
+            if group_index < 0 or group_index >= len(groups_view):
                 await query.edit_message_text("❌ 无效的群组索引")
                 return
             
-            group_name, group_config = group_items[group_index]
+            group_name, group_config = groups_view.get(group_index)
             group_display_name = group_config.get('name', group_name)
             channel_ids = group_config.get('channel_ids', [])
             
             if not channel_ids:
-                keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+                reply_markup = _BACK_ONLY_MARKUP
                 await query.edit_message_text(
                     f"❌ 群组「{group_display_name}」没有配置的渠道",
                     reply_markup=reply_markup
@@ -569,11 +712,10 @@ class AdminHandler:
             current_channels = [channel.get('id', '') for channel in channel_ids]
             channels_text = '\n'.join([f"• {channel}" for channel in current_channels])
             
-            keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = _BACK_ONLY_MARKUP
             
             await query.edit_message_text(
-                f"🗑️ 删除群组「{group_display_name}」的渠道\n━━━━━━━━━━━━━━━━\n"
+                f"🗑️ 删除群组「{group_display_name}」的渠道\n{_SEP}\n"
                 f"当前渠道列表：\n{channels_text}\n\n"
                 f"请输入要删除的渠道ID：\n\n"
                 f"💡 支持多种输入格式：\n"
@@ -586,14 +728,13 @@ class AdminHandler:
             )
             
         except Exception as e:
-            logger.error(f"处理选择群组删除渠道失败: {str(e)}", exc_info=True)
+            logger.error("处理选择群组删除渠道失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 处理选择群组失败: {str(e)}")
     
     async def _show_channel_ids_for_deletion(self, query, page: int = 0, group_index: int = None) -> None:
         """显示渠道ID列表供用户选择删除"""
         try:
-            groups_config = self.config_loader.get_groups_config()
-            group_items = list(groups_config.items())
+            groups_view = self._get_groups_view()
             
             # 如果没有指定group_index，从状态中获取
             if group_index is None:
@@ -605,20 +746,19 @@ class AdminHandler:
                     await query.edit_message_text("❌ 未找到选中的群组，请重新选择")
                     return
             
-            if group_index < 0 or group_index >= len(group_items):
+            if group_index < 0 or group_index >= len(groups_view):
                 await query.edit_message_text("❌ 无效的群组索引")
                 return
             
-            group_name, group_config = group_items[group_index]
+            group_name, group_config = groups_view.get(group_index)
             group_display_name = group_config.get('name', group_name)
             channel_ids = group_config.get('channel_ids', [])
             
             if not channel_ids:
-                keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(
+                await self._edit_if_changed(
+                    query,
                     f"❌ 群组「{group_display_name}」没有配置的渠道",
-                    reply_markup=reply_markup
+                    reply_markup=_BACK_ONLY_MARKUP
                 )
                 return
             
@@ -627,21 +767,16 @@ class AdminHandler:
             self.admin_state.set_channel_id_list_selection(user_id, channel_ids, group_index, page)
             
             # 计算分页
-            total_items = len(channel_ids)
-            total_pages = math.ceil(total_items / self.items_per_page)
-            start_index = page * self.items_per_page
-            end_index = min(start_index + self.items_per_page, total_items)
+            page_items, start_index, total_pages = self._paginate(channel_ids, page)
             
             # 构建消息文本
-            text = f"🗑️ 删除群组「{group_display_name}」的渠道 (第{page + 1}/{total_pages}页)\n━━━━━━━━━━━━━━━━\n"
-            text += "请选择要删除的渠道ID：\n\n"
+            text = _HDR_CHANNEL_ID_LIST % (group_display_name, page + 1, total_pages)
             
             # 构建键盘
-            keyboard = []
-            for i in range(start_index, end_index):
-                channel_id = channel_ids[i].get('id', '')
-                button_text = f"{i + 1}. {channel_id}"
-                keyboard.append([InlineKeyboardButton(button_text, callback_data=f"delete_channel_id_{i}")])
+            keyboard = [
+                [InlineKeyboardButton(f"{i + 1}. {channel.get('id', '')}", callback_data=f"delete_channel_id_{i}")]
+                for i, channel in enumerate(page_items, start=start_index)
+            ]
             
             # 添加分页按钮
             if total_pages > 1:
@@ -654,13 +789,13 @@ class AdminHandler:
                     keyboard.append(page_buttons)
             
             # 添加返回按钮
-            keyboard.append([InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")])
+            keyboard.append([_BACK_BUTTON])
             
             reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
+            await self._edit_if_changed(query, text, reply_markup=reply_markup)
             
         except Exception as e:
-            logger.error(f"显示渠道ID列表失败: {str(e)}", exc_info=True)
+            logger.error("显示渠道ID列表失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示渠道ID列表失败: {str(e)}")
     
     async def _confirm_delete_channel_id(self, query, channel_id_index: int) -> None:
@@ -683,24 +818,21 @@ class AdminHandler:
             channel_to_delete = channel_ids[channel_id_index].get('id', '')
             
             # 执行删除
-            if self.config_loader.remove_channel_id_from_group(group_index, channel_to_delete):
+            if await self._run_config_write(self.config_loader.remove_channel_id_from_group, group_index, channel_to_delete):
+                self._invalidate_config_cache()
                 await query.edit_message_text(f"✅ 已成功删除渠道ID：{channel_to_delete}")
                 
                 # 重新加载配置
-                await self._reload_config(query)
+                await self._reload_config(query.message)
                 
                 # 延迟后返回主菜单
-                await asyncio.sleep(2)
-                await self._back_to_main_menu(query)
+                self._schedule_back_to_main(query, 2.0)
             else:
-                await query.edit_message_text(f"❌ 删除渠道ID {channel_to_delete} 失败")
-                
-                # 延迟后返回主菜单
-                await asyncio.sleep(2)
-                await self._back_to_main_menu(query)
+                # 提示失败并稍后返回主菜单
+                await self._edit_and_return(query, f"❌ 删除渠道ID {channel_to_delete} 失败")
                 
         except Exception as e:
-            logger.error(f"删除渠道ID失败: {str(e)}", exc_info=True)
+            logger.error("删除渠道ID失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 删除渠道ID失败: {str(e)}")
     
     async def _handle_add_investment_group_request(self, query) -> None:
@@ -709,15 +841,14 @@ class AdminHandler:
             user_id = query.from_user.id
             self.admin_state.set_waiting_for_new_investment_group_name(user_id)
             
-            keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = _BACK_ONLY_MARKUP
             
             await query.edit_message_text(
-                "🏷️ 新增代投组\n━━━━━━━━━━━━━━━━\n请输入代投组名称（如：投流3组）：",
+                f"🏷️ 新增代投组\n{_SEP}\n请输入代投组名称（如：投流3组）：",
                 reply_markup=reply_markup
             )
         except Exception as e:
-            logger.error(f"处理新增代投组请求失败: {str(e)}", exc_info=True)
+            logger.error("处理新增代投组请求失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示新增代投组界面失败: {str(e)}")
     
     async def _handle_delete_investment_group_request(self, query) -> None:
@@ -725,90 +856,66 @@ class AdminHandler:
         try:
             await self._show_investment_groups_for_deletion(query, 0)
         except Exception as e:
-            logger.error(f"显示代投组列表失败: {str(e)}", exc_info=True)
+            logger.error("显示代投组列表失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示代投组列表失败: {str(e)}")
     
     async def _show_investment_groups_for_deletion(self, query, page: int = 0) -> None:
         """显示代投组列表供用户选择删除"""
         try:
-            groups_config = self.config_loader.get_groups_config()
+            groups_view = self._get_groups_view()
             
-            if not groups_config:
-                keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(
+            if not groups_view:
+                await self._edit_if_changed(
+                    query,
                     "❌ 当前没有代投组配置",
-                    reply_markup=reply_markup
+                    reply_markup=_BACK_ONLY_MARKUP
                 )
                 return
             
-            # 转换为列表以便分页
-            group_items = list(groups_config.items())
-            
-            # 计算分页
-            total_items = len(group_items)
-            total_pages = math.ceil(total_items / self.items_per_page)
-            start_index = page * self.items_per_page
-            end_index = min(start_index + self.items_per_page, total_items)
-            
-            # 构建消息文本
-            text = f"🗑️ 删除代投组 (第{page + 1}/{total_pages}页)\n━━━━━━━━━━━━━━━━\n"
-            text += "请选择要删除的代投组：\n\n"
-            
-            # 构建键盘
-            keyboard = []
-            for i in range(start_index, end_index):
-                group_name, group_config = group_items[i]
-                group_display_name = group_config.get('name', group_name)
-                tg_group = group_config.get('tg_group', '')
-                channel_count = len(group_config.get('channel_ids', []))
-                button_text = f"{i + 1}. {group_display_name} ({tg_group}, {channel_count}个渠道)"
-                keyboard.append([InlineKeyboardButton(button_text, callback_data=f"delete_investment_group_{i}")])
-            
-            # 添加分页按钮
-            if total_pages > 1:
-                page_buttons = []
-                if page > 0:
-                    page_buttons.append(InlineKeyboardButton("⬅️ 上一页", callback_data=f"delete_investment_page_{page - 1}"))
-                if page < total_pages - 1:
-                    page_buttons.append(InlineKeyboardButton("➡️ 下一页", callback_data=f"delete_investment_page_{page + 1}"))
-                if page_buttons:
-                    keyboard.append(page_buttons)
+            if self._investment_delete_pages is None:
+                def build_button(i, item):
+                    group_name, group_config = item
+                    group_display_name = group_config.get('name', group_name)
+                    tg_group = group_config.get('tg_group', '')
+                    channel_count = len(group_config.get('channel_ids', []))
+                    button_text = f"{i + 1}. {group_display_name} ({tg_group}, {channel_count}个渠道)"
+                    return InlineKeyboardButton(button_text, callback_data=f"delete_investment_group_{i}")
+                
+                self._investment_delete_pages = self._build_list_pages(
+                    groups_view, _HDR_INVESTMENT_LIST, build_button, "delete_investment_page_"
+                )
             
-            # 添加返回按钮
-            keyboard.append([InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
+            # 页码越界时显示最后一页
+            pages = self._investment_delete_pages
+            text, reply_markup = pages[min(max(page, 0), len(pages) - 1)]
+            await self._edit_if_changed(query, text, reply_markup=reply_markup)
             
         except Exception as e:
-            logger.error(f"显示代投组列表失败: {str(e)}", exc_info=True)
+            logger.error("显示代投组列表失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示代投组列表失败: {str(e)}")
     
     async def _confirm_delete_investment_group(self, query, group_index: int) -> None:
         """确认删除代投组"""
         try:
-            groups_config = self.config_loader.get_groups_config()
-            group_items = list(groups_config.items())
+            groups_view = self._get_groups_view()
             
-            if group_index < 0 or group_index >= len(group_items):
+            if group_index < 0 or group_index >= len(groups_view):
                 await query.edit_message_text("❌ 无效的代投组索引")
                 return
             
-            group_name, group_config = group_items[group_index]
+            group_name, group_config = groups_view.get(group_index)
             group_display_name = group_config.get('name', group_name)
             tg_group = group_config.get('tg_group', '')
             channel_ids = group_config.get('channel_ids', [])
             channel_count = len(channel_ids)
             
             # 显示确认信息
-            text = f"⚠️ 确认删除代投组\n━━━━━━━━━━━━━━━━\n"
+            text = f"⚠️ 确认删除代投组\n{_SEP}\n"
             text += f"代投组名称：{group_display_name}\n"
             text += f"群组ID：{tg_group}\n"
             text += f"渠道数量：{channel_count}个\n"
             if channel_ids:
-                channel_names = [channel.get('id', '') for channel in channel_ids]
-                text += f"渠道列表：{', '.join(channel_names)}\n"
+                text += f"渠道列表：{', '.join(channel.get('id', '') for channel in channel_ids)}\n"
             text += f"\n⚠️ 此操作将删除整个代投组配置！"
             
             keyboard = [
@@ -817,106 +924,76 @@ class AdminHandler:
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
             
-            await query.edit_message_text(text, reply_markup=reply_markup)
+            await self._edit_if_changed(query, text, reply_markup=reply_markup)
             
         except Exception as e:
-            logger.error(f"确认删除代投组失败: {str(e)}", exc_info=True)
-            await query.edit_message_text(f"❌ 确认删除代投组失败: {str(e)}")
-            
-            # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(query)
+            logger.error("确认删除代投组失败: %s", e, exc_info=True)
+            # 提示失败并稍后返回主菜单
+            await self._edit_and_return(query, f"❌ 确认删除代投组失败: {str(e)}")
     
     async def _execute_delete_investment_group(self, query, group_index: int) -> None:
         """执行删除代投组"""
         try:
-            groups_config = self.config_loader.get_groups_config()
-            group_items = list(groups_config.items())
+            groups_view = self._get_groups_view()
             
-            if group_index < 0 or group_index >= len(group_items):
+            if group_index < 0 or group_index >= len(groups_view):
                 await query.edit_message_text("❌ 无效的代投组索引")
                 return
             
-            group_name, group_config = group_items[group_index]
+            group_name, group_config = groups_view.get(group_index)
             
             # 执行删除
-            if self.config_loader.remove_group_config(group_name):
+            if await self._run_config_write(self.config_loader.remove_group_config, group_name):
+                self._invalidate_config_cache()
                 await query.edit_message_text(f"✅ 已成功删除代投组：{group_name}")
                 
                 # 重新加载配置
-                await self._reload_config(query)
+                await self._reload_config(query.message)
                 
                 # 延迟后返回主菜单
-                await asyncio.sleep(2)
-                await self._back_to_main_menu(query)
+                self._schedule_back_to_main(query, 2.0)
             else:
-                await query.edit_message_text(f"❌ 删除代投组 {group_name} 失败")
-                
-                # 延迟后返回主菜单
-                await asyncio.sleep(2)
-                await self._back_to_main_menu(query)
+                # 提示失败并稍后返回主菜单
+                await self._edit_and_return(query, f"❌ 删除代投组 {group_name} 失败")
                 
         except Exception as e:
-            logger.error(f"执行删除代投组失败: {str(e)}", exc_info=True)
+            logger.error("执行删除代投组失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 执行删除代投组失败: {str(e)}")
     
     async def _show_channel_group_list(self, query, page: int = 0) -> None:
         """显示渠道分组列表"""
         try:
-            user_id = query.from_user.id
             channel_groups = self.config_loader.get_channel_groups_config()
             
             if not channel_groups:
-                keyboard = [[InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(
+                await self._edit_if_changed(
+                    query,
                     "❌ 当前没有渠道分组配置",
-                    reply_markup=reply_markup
+                    reply_markup=_BACK_ONLY_MARKUP
                 )
                 return
             
             # 设置状态
+            user_id = query.from_user.id
             self.admin_state.set_channel_group_list_selection(user_id, channel_groups, page)
             
-            # 转换为列表以便分页
-            channel_items = list(channel_groups.items())
-            
-            # 计算分页
-            total_items = len(channel_items)
-            total_pages = math.ceil(total_items / self.items_per_page)
-            start_index = page * self.items_per_page
-            end_index = min(start_index + self.items_per_page, total_items)
-            
-            # 构建消息文本
-            text = f"🏷️ 渠道分组列表 (第{page + 1}/{total_pages}页)\n━━━━━━━━━━━━━━━━\n"
-            text += "请选择要删除的渠道分组：\n\n"
-            
-            # 构建键盘
-            keyboard = []
-            for i in range(start_index, end_index):
-                channel_name, group_ids = channel_items[i]
-                group_ids_str = ", ".join(map(str, group_ids))
-                button_text = f"{i + 1}. {channel_name} → [{group_ids_str}]"
-                keyboard.append([InlineKeyboardButton(button_text, callback_data=f"delete_channel_{i}")])
-            
-            # 添加分页按钮
-            if total_pages > 1:
-                page_buttons = []
-                if page > 0:
-                    page_buttons.append(InlineKeyboardButton("⬅️ 上一页", callback_data=f"channel_page_{page - 1}"))
-                if page < total_pages - 1:
-                    page_buttons.append(InlineKeyboardButton("➡️ 下一页", callback_data=f"channel_page_{page + 1}"))
-                if page_buttons:
-                    keyboard.append(page_buttons)
-            
-            # 添加返回按钮
-            keyboard.append([InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")])
+            if self._channel_group_pages is None:
+                def build_button(i, item):
+                    channel_name, group_ids = item
+                    group_ids_str = ", ".join(map(str, group_ids))
+                    return InlineKeyboardButton(f"{i + 1}. {channel_name} → [{group_ids_str}]", callback_data=f"delete_channel_{i}")
+                
+                self._channel_group_pages = self._build_list_pages(
+                    channel_groups.items(), _HDR_CHANNEL_GROUP_LIST, build_button, "channel_page_"
+                )
             
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
+            # 页码越界时显示最后一页
+            pages = self._channel_group_pages
+            text, reply_markup = pages[min(max(page, 0), len(pages) - 1)]
+            await self._edit_if_changed(query, text, reply_markup=reply_markup)
             
         except Exception as e:
-            logger.error(f"显示渠道分组列表失败: {str(e)}", exc_info=True)
+            logger.error("显示渠道分组列表失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示渠道分组列表失败: {str(e)}")
     
     async def _confirm_delete_channel_group(self, query, channel_index: int) -> None:
@@ -935,70 +1012,92 @@ class AdminHandler:
             channel_name, group_ids = channel_items[channel_index]
             
             # 执行删除
-            if self.config_loader.remove_channel_group_config(channel_name):
+            if await self._run_config_write(self.config_loader.remove_channel_group_config, channel_name):
+                self._invalidate_config_cache()
                 group_ids_str = ", ".join(map(str, group_ids))
                 await query.edit_message_text(f"✅ 已成功删除渠道分组：{channel_name} → [{group_ids_str}]")
                 
                 # 重新加载配置
-                await self._reload_config(query)
+                await self._reload_config(query.message)
                 
                 # 延迟后返回主菜单
-                await asyncio.sleep(2)
-                await self._back_to_main_menu(query)
+                self._schedule_back_to_main(query, 2.0)
             else:
-                await query.edit_message_text(f"❌ 删除渠道分组 {channel_name} 失败")
-                
-                # 延迟后返回主菜单
-                await asyncio.sleep(2)
-                await self._back_to_main_menu(query)
+                # 提示失败并稍后返回主菜单
+                await self._edit_and_return(query, f"❌ 删除渠道分组 {channel_name} 失败")
                 
         except Exception as e:
-            logger.error(f"删除渠道分组失败: {str(e)}", exc_info=True)
+            logger.error("删除渠道分组失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 删除渠道分组失败: {str(e)}")
     
-    async def _back_to_main_menu(self, update_or_query) -> None:
-        """返回主菜单"""
+    async def _edit_and_return(self, query, text: str, delay: float = 2.0) -> None:
+        """编辑一次消息提示结果并稍后返回主菜单"""
+        await query.edit_message_text(f"{text}\n\n⏳ 即将返回主菜单…")
+        self._schedule_back_to_main(query, delay)
+    
+    def _schedule_back_to_main(self, update_or_query, delay: float, back_to=None) -> None:
+        """在后台延迟返回主菜单，不阻塞当前处理函数
+        
+        同一条消息（或同一聊天的文本消息）在等待期间再次调度时，取消之前的任务，
+        只保留最后一次返回，避免短时间内对同一消息重复编辑触发 Telegram 的频率限制。
+        
+        Args:
+            back_to: 可选的返回函数（如返回Google表格配置菜单），默认返回主菜单
+        """
+        if isinstance(update_or_query, Update):
+            back_to_main = back_to or self._back_to_main_menu_from_update
+            key = (update_or_query.effective_chat.id, None)
+        else:
+            back_to_main = back_to or self._back_to_main_menu_from_query
+            message = update_or_query.message
+            key = (message.chat_id, message.message_id) if message else (update_or_query.id, None)
+        
+        pending = self._pending_returns.get(key)
+        if pending is not None and not pending.done():
+            pending.cancel()
+        
+        task = asyncio.create_task(self._delayed_back_to_main(back_to_main, update_or_query, delay))
+        self._pending_returns[key] = task
+        # 保留任务引用，避免任务在完成前被垃圾回收
+        self._background_tasks.add(task)
+        
+        def _on_done(done_task, key=key):
+            self._background_tasks.discard(done_task)
+            if self._pending_returns.get(key) is done_task:
+                del self._pending_returns[key]
+        task.add_done_callback(_on_done)
+    
+    async def _delayed_back_to_main(self, back_to_main, update_or_query, delay: float) -> None:
+        """等待指定秒数后返回主菜单"""
+        try:
+            await asyncio.sleep(delay)
+            await back_to_main(update_or_query)
+        except Exception:
+            logger.exception("延迟返回主菜单失败")
+    
+    async def _back_to_main_menu_from_query(self, query) -> None:
+        """返回主菜单（回调查询，编辑原消息）"""
         try:
             # 清除用户状态
-            if hasattr(update_or_query, 'from_user'):
-                # 是query对象
-                user_id = update_or_query.from_user.id
-                self.admin_state.clear_state(user_id)
-            elif hasattr(update_or_query, 'effective_user'):
-                # 是update对象
-                user_id = update_or_query.effective_user.id
-                self.admin_state.clear_state(user_id)
+            self.admin_state.clear_state(query.from_user.id)
             
             # 重新显示主菜单
-            keyboard = [
-                [InlineKeyboardButton("新增管理员", callback_data="add_admin"),
-                 InlineKeyboardButton("删除管理员", callback_data="delete_admin")],
-                [InlineKeyboardButton("新增渠道分组", callback_data="add_channel_group"),
-                 InlineKeyboardButton("删除渠道分组", callback_data="delete_channel_group")],
-                [InlineKeyboardButton("新增代投组", callback_data="add_investment_group"),
-                 InlineKeyboardButton("删除代投组", callback_data="delete_investment_group")],
-                [InlineKeyboardButton("配置Google表格", callback_data="config_google_sheets")],                 
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            await query.edit_message_text(_MAIN_MENU_TEXT, reply_markup=_MAIN_MENU_MARKUP)
+        except Exception as e:
+            logger.error("返回主菜单失败: %s", e, exc_info=True)
+            await query.edit_message_text("❌ 返回主菜单失败")
+    
+    async def _back_to_main_menu_from_update(self, update: Update) -> None:
+        """返回主菜单（文本消息，发送新消息）"""
+        try:
+            # 清除用户状态
+            self.admin_state.clear_state(update.effective_user.id)
             
-            if hasattr(update_or_query, 'edit_message_text'):
-                # 是query对象
-                await update_or_query.edit_message_text(
-                    "🔧 管理员控制面板\n━━━━━━━━━━━━━━━━\n请选择要执行的操作：",
-                    reply_markup=reply_markup
-                )
-            elif hasattr(update_or_query, 'message'):
-                # 是update对象
-                await update_or_query.message.reply_text(
-                "🔧 管理员控制面板\n━━━━━━━━━━━━━━━━\n请选择要执行的操作：",
-                reply_markup=reply_markup
-            )
+            # 重新显示主菜单
+            await update.message.reply_text(_MAIN_MENU_TEXT, reply_markup=_MAIN_MENU_MARKUP)
         except Exception as e:
-            logger.error(f"返回主菜单失败: {str(e)}", exc_info=True)
-            if hasattr(update_or_query, 'edit_message_text'):
-                await update_or_query.edit_message_text("❌ 返回主菜单失败")
-            elif hasattr(update_or_query, 'message'):
-                await update_or_query.message.reply_text("❌ 返回主菜单失败")
+            logger.error("返回主菜单失败: %s", e, exc_info=True)
+            await update.message.reply_text("❌ 返回主菜单失败")
     
     async def handle_admin_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """处理管理员文本消息"""
@@ -1009,60 +1108,27 @@ class AdminHandler:
             user_id = update.effective_user.id
             message_text = update.message.text.strip()
             
-            logger.info(f"收到用户 {user_id} 的消息: {message_text}")
-            
-            # 处理新增管理员ID输入
-            if self.admin_state.is_waiting_for_add_admin_id(user_id):
-                logger.info(f"处理用户 {user_id} 的新增管理员ID输入")
-                await self._handle_add_admin_id_input(update, message_text)
-            
-            # 处理新增渠道名称输入
-            elif self.admin_state.is_waiting_for_new_channel_group_name(user_id):
-                logger.info(f"处理用户 {user_id} 的渠道名称输入")
-                await self._handle_channel_group_name_input(update, message_text)
-            
-            # 处理渠道群组ID输入
-            elif self.admin_state.is_waiting_for_channel_group_id(user_id):
-                logger.info(f"处理用户 {user_id} 的渠道群组ID输入")
-                await self._handle_channel_group_id_input(update, message_text)
-            
-            # 处理新渠道ID输入
-            elif self.admin_state.is_waiting_for_new_channel_id(user_id):
-                logger.info(f"处理用户 {user_id} 的新渠道ID输入")
-                await self._handle_new_channel_id_input(update, message_text)
-            
-            # 处理删除渠道ID输入
-            elif self.admin_state.is_waiting_for_delete_channel_ids(user_id):
-                logger.info(f"处理用户 {user_id} 的删除渠道ID输入")
-                await self._handle_delete_channel_ids_input(update, message_text)
-            
-            # 处理新代投组名称输入
-            elif self.admin_state.is_waiting_for_new_investment_group_name(user_id):
-                logger.info(f"处理用户 {user_id} 的新代投组名称输入")
-                await self._handle_new_investment_group_name_input(update, message_text)
-            
-            # 处理新代投组群组ID输入
-            elif self.admin_state.is_waiting_for_new_investment_group_id(user_id):
-                logger.info(f"处理用户 {user_id} 的新代投组群组ID输入")
-                await self._handle_new_investment_group_id_input(update, message_text)
-            
-            # 处理表格ID输入
-            elif self.admin_state.is_waiting_for_spreadsheet_id(user_id):
-                logger.info(f"处理用户 {user_id} 的表格ID输入")
-                await self._handle_spreadsheet_id_input(update, message_text)
-            else:
-                logger.debug(f"用户 {user_id} 当前没有等待的输入状态")
+            logger.info("收到用户 %s 的消息: %s", user_id, message_text)
+            
+            # 按当前等待的输入状态分发
+            entry = self._input_handlers.get(self.admin_state.get_current_state(user_id))
+            if entry is None:
+                logger.debug("用户 %s 当前没有等待的输入状态", user_id)
+                return
+            
+            description, handler = entry
+            logger.info("处理用户 %s 的%s输入", user_id, description)
+            await handler(update, message_text)
                 
         except Exception as e:
-            logger.error(f"处理管理员消息失败: {str(e)}", exc_info=True)
+            logger.error("处理管理员消息失败: %s", e, exc_info=True)
     
     async def _handle_add_admin_id_input(self, update: Update, admin_id_str: str) -> None:
         """处理新增管理员ID输入"""
-        try:
-            admin_id = int(admin_id_str)
-        except ValueError:
+        if not _INT_RE.fullmatch(admin_id_str):
             await update.message.reply_text("❌ 请输入有效的用户ID（数字格式）")
             return
+        admin_id = int(admin_id_str)
         
         # 检查是否已经是管理员
         if admin_id in self.config_loader.get_admins():
@@ -1070,22 +1136,20 @@ class AdminHandler:
             return
         
         # 添加管理员
-        if self.config_loader.add_admin(admin_id):
+        if await self._run_config_write(self.config_loader.add_admin, admin_id):
             await update.message.reply_text(f"✅ 已成功添加管理员：{admin_id}")
             
             # 清除状态并重新加载配置
             self.admin_state.clear_state(update.effective_user.id)
-            await self._reload_config(update)
+            await self._reload_config(update.message)
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
         else:
             await update.message.reply_text(f"❌ 添加管理员 {admin_id} 失败")
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
     
     async def _handle_channel_group_name_input(self, update: Update, channel_name: str) -> None:
         """处理渠道名称输入"""
@@ -1104,11 +1168,10 @@ class AdminHandler:
     
     async def _handle_channel_group_id_input(self, update: Update, group_id_str: str) -> None:
         """处理渠道群组ID输入"""
-        try:
-            group_id = int(group_id_str)
-        except ValueError:
+        if not _INT_RE.fullmatch(group_id_str):
             await update.message.reply_text("❌ 请输入有效的群组ID（数字格式）")
             return
+        group_id = int(group_id_str)
             
         # 获取正在添加的渠道名称
         user_id = update.effective_user.id
@@ -1118,22 +1181,21 @@ class AdminHandler:
             return
             
         # 添加渠道分组配置
-        if self.config_loader.add_channel_group_config(channel_name, group_id):
+        if await self._run_config_write(self.config_loader.add_channel_group_config, channel_name, group_id):
+            self._invalidate_config_cache()
             await update.message.reply_text(f"✅ 已成功添加渠道分组：{channel_name} → {group_id}")
             
             # 清除状态并重新加载配置
             self.admin_state.clear_state(user_id)
-            await self._reload_config(update)
+            await self._reload_config(update.message)
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
         else:
             await update.message.reply_text(f"❌ 添加渠道分组失败")
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
     
     async def _handle_new_channel_id_input(self, update: Update, channel_id_str: str) -> None:
         """处理新渠道ID输入"""
@@ -1144,19 +1206,7 @@ class AdminHandler:
                 return
             
             # 分割多个渠道ID（支持换行和|分隔）
-            channel_ids = []
-            # 先按换行分割
-            lines = channel_id_input.split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                # 再按|分割
-                parts = line.split('|')
-                for part in parts:
-                    part = part.strip()
-                    if part:
-                        channel_ids.append(part)
+            channel_ids = [part.strip() for part in _SPLIT_RE.split(channel_id_input) if part.strip()]
             if not channel_ids:
                 await update.message.reply_text("❌ 请输入有效的渠道ID")
                 return
@@ -1168,24 +1218,14 @@ class AdminHandler:
                 await update.message.reply_text("❌ 群组名称丢失，请重新开始操作")
                 return
             
-            # 批量添加渠道ID
-            success_count = 0
-            failed_channels = []
-            
-            for channel_id in channel_ids:
-                # 检查格式是否符合要求 (例如 FBA8-18)
-                # if not re.match(r'^[A-Z0-9-]+$', channel_id):
-                #     failed_channels.append(f"{channel_id}(格式错误)")
-                #     continue
-                
-                # 添加渠道ID
-                if self.config_loader.add_channel_id_to_group(group_name, channel_id):
-                    success_count += 1
-                else:
-                    failed_channels.append(channel_id)
+            # 批量添加渠道ID，一次写入配置文件
+            success_count, failed_channels = await self._run_config_write(
+                self.config_loader.add_channel_ids_to_group_bulk, group_name, channel_ids,
+                failed=(0, list(channel_ids))
+            )
             
             # 生成结果消息
-            result_message = f"📝 批量添加渠道ID结果\n━━━━━━━━━━━━━━━━\n"
+            result_message = f"📝 批量添加渠道ID结果\n{_SEP}\n"
             result_message += f"群组：{group_name}\n"
             result_message += f"成功添加：{success_count} 个\n"
             
@@ -1199,19 +1239,17 @@ class AdminHandler:
             
             # 清除状态并重新加载配置
             self.admin_state.clear_state(user_id)
-            await self._reload_config(update)
+            await self._reload_config(update.message)
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
                 
         except Exception as e:
-            logger.error(f"处理新渠道ID输入失败: {str(e)}", exc_info=True)
+            logger.error("处理新渠道ID输入失败: %s", e, exc_info=True)
             await update.message.reply_text(f"❌ 处理新渠道ID输入失败: {str(e)}")
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
     
     async def _handle_delete_channel_ids_input(self, update: Update, channel_ids_str: str) -> None:
         """处理删除渠道ID输入"""
@@ -1221,27 +1259,9 @@ class AdminHandler:
                 await update.message.reply_text("❌ 渠道ID不能为空")
                 return
             
-            # 分割多个渠道ID（支持换行、|分隔和•符号格式）
-            channel_ids_to_delete = []
-            lines = channel_ids_input.split('\n')
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 处理带•符号的格式
-                if line.startswith('•'):
-                    channel_id = line[1:].strip()  # 去掉•符号
-                    if channel_id:
-                        channel_ids_to_delete.append(channel_id)
-                else:
-                    # 处理|分隔的格式
-                    parts = line.split('|')
-                    for part in parts:
-                        part = part.strip()
-                        if part:
-                            channel_ids_to_delete.append(part)
+            # 分割多个渠道ID（支持换行、|分隔和•符号格式），先去掉行首的•符号
+            channel_ids_input = _BULLET_RE.sub('', channel_ids_input)
+            channel_ids_to_delete = [part.strip() for part in _SPLIT_RE.split(channel_ids_input) if part.strip()]
             
             if not channel_ids_to_delete:
                 await update.message.reply_text("❌ 请输入有效的渠道ID")
@@ -1254,40 +1274,35 @@ class AdminHandler:
                 await update.message.reply_text("❌ 群组名称丢失，请重新开始操作")
                 return
             
-            # 获取群组索引
-            groups_config = self.config_loader.get_groups_config()
-            group_items = list(groups_config.items())
-            group_index = None
-            for i, (name, config) in enumerate(group_items):
-                if name == group_name:
-                    group_index = i
-                    break
+            # 按名称直接取群组配置
+            group_config = self.config_loader.get_groups_config().get(group_name)
             
-            if group_index is None:
+            if group_config is None:
                 await update.message.reply_text("❌ 找不到指定的群组")
                 return
             
-            # 批量删除渠道ID
-            success_count = 0
-            failed_channels = []
+            # 检查渠道ID是否存在于该群组中，不存在或重复输入的跳过
+            current_channel_ids = {channel.get('id', '') for channel in group_config.get('channel_ids', [])}
+            existing_channels = []
             skipped_channels = []
-            
             for channel_id in channel_ids_to_delete:
-                # 检查渠道ID是否存在于该群组中
-                current_channel_ids = [channel.get('id', '') for channel in group_items[group_index][1].get('channel_ids', [])]
-                
-                if channel_id not in current_channel_ids:
-                    skipped_channels.append(channel_id)
-                    continue
-                
-                # 删除渠道ID - 使用group_name而不是group_index
-                if self.config_loader.remove_channel_id_from_group_by_name(group_name, channel_id):
-                    success_count += 1
+                if channel_id in current_channel_ids:
+                    current_channel_ids.discard(channel_id)
+                    existing_channels.append(channel_id)
                 else:
-                    failed_channels.append(channel_id)
+                    skipped_channels.append(channel_id)
+            
+            # 批量删除渠道ID，一次写入配置文件
+            if existing_channels:
+                success_count, failed_channels = await self._run_config_write(
+                    self.config_loader.remove_channel_ids_from_group_bulk, group_name, existing_channels,
+                    failed=(0, list(existing_channels))
+                )
+            else:
+                success_count, failed_channels = 0, []
             
             # 生成结果消息
-            result_message = f"🗑️ 批量删除渠道ID结果\n━━━━━━━━━━━━━━━━\n"
+            result_message = f"🗑️ 批量删除渠道ID结果\n{_SEP}\n"
             result_message += f"群组：{group_name}\n"
             result_message += f"成功删除：{success_count} 个\n"
             
@@ -1307,19 +1322,17 @@ class AdminHandler:
             
             # 清除状态并重新加载配置
             self.admin_state.clear_state(user_id)
-            await self._reload_config(update)
+            await self._reload_config(update.message)
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
                 
         except Exception as e:
-            logger.error(f"处理删除渠道ID输入失败: {str(e)}", exc_info=True)
+            logger.error("处理删除渠道ID输入失败: %s", e, exc_info=True)
             await update.message.reply_text(f"❌ 处理删除渠道ID输入失败: {str(e)}")
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
     
     async def _handle_new_investment_group_name_input(self, update: Update, group_name: str) -> None:
         """处理新增代投组名称输入"""
@@ -1338,11 +1351,10 @@ class AdminHandler:
     
     async def _handle_new_investment_group_id_input(self, update: Update, group_id_str: str) -> None:
         """处理新增代投组群组ID输入"""
-        try:
-            group_id = int(group_id_str)
-        except ValueError:
+        if not _INT_RE.fullmatch(group_id_str):
             await update.message.reply_text("❌ 请输入有效的群组ID（数字格式）")
             return
+        group_id = int(group_id_str)
             
         # 获取正在添加的代投组名称
         user_id = update.effective_user.id
@@ -1352,203 +1364,189 @@ class AdminHandler:
             return
             
         # 添加代投组配置
-        if self.config_loader.add_investment_group_config(group_name, group_id):
+        if await self._run_config_write(self.config_loader.add_investment_group_config, group_name, group_id):
+            self._invalidate_config_cache()
             await update.message.reply_text(f"✅ 已成功添加代投组：{group_name} → {group_id}")
             
             # 清除状态并重新加载配置
             self.admin_state.clear_state(user_id)
-            await self._reload_config(update)
+            await self._reload_config(update.message)
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
         else:
             await update.message.reply_text(f"❌ 添加代投组失败")
             
             # 延迟后返回主菜单
-            await asyncio.sleep(2)
-            await self._back_to_main_menu(update)
+            self._schedule_back_to_main(update, 2.0)
     
-    async def _reload_config(self, update_or_query) -> None:
-        """重新加载配置"""
+    async def _reload_config(self, message) -> None:
+        """重新加载配置
+        
+        Args:
+            message: 用于回复重载结果的消息（query.message 或 update.message）
+        """
         try:
-            # 重新加载配置文件
-            self.config_loader.reload_config()
+            # 在线程池中重新加载配置文件，重载完成后再清空缓存，
+            # 避免等待期间其他回调用旧配置重建缓存。
+            # 修改配置的方法会先更新内存再写文件，0.5秒内刚重载过时文件内容与内存一致，跳过重复读取
+            async with self._reload_lock:
+                if time.monotonic() - self._last_reload_monotonic >= 0.5:
+                    await self._run_config_io(self.config_loader.reload_config)
+                    self._last_reload_monotonic = time.monotonic()
+            self._invalidate_config_cache()
             
             # 更新管理员列表
-            self.admins = self.config_loader.get_admins()
+            self._load_admins()
             
             # 通知其他组件更新配置
             await self._notify_components_config_updated()
             
             # 发送重载成功消息
-            if hasattr(update_or_query, 'message'):
-                # 是update对象
-                await update_or_query.message.reply_text("🔄 配置已重新加载")
-            elif hasattr(update_or_query, 'reply_text'):
-                # 是message对象
-                await update_or_query.reply_text("🔄 配置已重新加载")
-            else:
-                # 是query对象
-                await update_or_query.message.reply_text("🔄 配置已重新加载")
+            await message.reply_text("🔄 配置已重新加载")
             
             logger.info("管理员配置已重新加载")
             
         except Exception as e:
             error_msg = f"❌ 重新加载配置失败：{str(e)}"
             logger.error(error_msg)
-            
-            if hasattr(update_or_query, 'message'):
-                await update_or_query.message.reply_text(error_msg)
-            elif hasattr(update_or_query, 'reply_text'):
-                await update_or_query.reply_text(error_msg)
-            else:
-                await update_or_query.message.reply_text(error_msg)
+            await message.reply_text(error_msg)
     
     async def _notify_components_config_updated(self):
         """通知所有组件配置已更新"""
-        try:
-            # 通知 user_command_handler 更新配置
-            if self.user_command_handler:
-                self.user_command_handler.update_config(self.config_loader)
-                logger.info("已通知 UserCommandHandler 配置更新")
-            
-            # 通知 api_data_sender_manager 更新配置
-            if self.api_data_sender_manager:
-                self.api_data_sender_manager.update_config(self.config_loader)
-                logger.info("已通知 ApiDataSenderManager 配置更新")
-            
-            logger.info("已通知所有组件配置更新")
-        except Exception as e:
-            logger.error(f"通知组件配置更新失败: {str(e)}")
+        # 只有创建 GoogleSheetsWriter（读取凭据文件、构建 Sheets 服务）会阻塞，放到线程池中并发执行；
+        # 组件属性的替换很轻量，在事件循环中进行，避免与正在运行的任务并发修改。
+        # 某个组件失败不影响其他组件
+        components = [
+            (name, component)
+            for name, component in (
+                ("UserCommandHandler", self.user_command_handler),
+                ("ApiDataSenderManager", self.api_data_sender_manager),
+            )
+            if component
+        ]
+        writers = await asyncio.gather(
+            *(asyncio.to_thread(GoogleSheetsWriter, self.config_loader) for _ in components),
+            return_exceptions=True
+        )
+        for (name, component), writer in zip(components, writers):
+            try:
+                if isinstance(writer, Exception):
+                    raise writer
+                component.update_config(self.config_loader, sheets_writer=writer)
+                logger.info("已通知 %s 配置更新", name)
+            except Exception as e:
+                logger.error("通知 %s 配置更新失败: %s", name, e, exc_info=e)
+        
+        logger.info("已通知所有组件配置更新")
+
+    def _render_google_sheets_menu(self, page: int = 0) -> tuple:
+        """渲染Google表格配置菜单
+        
+        Returns:
+            (消息文本, 键盘)
+        """
+        # 获取所有群组及其表格配置（按配置版本缓存）
+        group_items, header_fields = self._get_google_sheets_menu_data()
+        if not group_items:
+            return "❌ 未找到任何群组配置", _BACK_ONLY_MARKUP
+        
+        # 计算分页
+        ipp = self.items_per_page
+        total_pages = (len(group_items) + ipp - 1) // ipp
+        page = min(max(page, 0), total_pages - 1)
+        start_index = page * ipp
+        
+        # 构建消息头部（不分页的基本信息），各行先收集到列表最后一次拼接
+        parts = [_HDR_GOOGLE_SHEETS.format(page=page + 1, total=total_pages, **header_fields)]
+        
+        # 构建键盘
+        keyboard = []
+        
+        # 显示当前页的群组
+        for group_name, group_config, spreadsheet_id in group_items[start_index:start_index + ipp]:
+            configured = spreadsheet_id != "未配置"
+            status = "✅" if configured else "❌"
+            display_id = spreadsheet_id if len(spreadsheet_id) <= 30 else f"{spreadsheet_id[:27]}..."
+            parts.append(f"{status} {group_name}: {display_id}\n")
+            
+            # 为每个群组添加配置按钮
+            keyboard.append(_make_group_row(group_name, configured))
+        
+        # 添加分页按钮
+        if total_pages > 1:
+            page_buttons = []
+            if page > 0:
+                page_buttons.append(InlineKeyboardButton("⬅️ 上一页", callback_data=f"google_sheets_page_{page - 1}"))
+            if page < total_pages - 1:
+                page_buttons.append(InlineKeyboardButton("➡️ 下一页", callback_data=f"google_sheets_page_{page + 1}"))
+            if page_buttons:
+                keyboard.append(page_buttons)
+        
+        # 添加返回按钮
+        keyboard.append([_BACK_BUTTON])
+        
+        return "".join(parts), InlineKeyboardMarkup(keyboard)
     
     async def _handle_config_google_sheets_request(self, query, page: int = 0) -> None:
         """处理Google表格配置请求"""
         try:
-            # 获取所有群组配置
-            groups_config = self.config_loader.get_groups_config()
-            if not groups_config:
-                await query.edit_message_text("❌ 未找到任何群组配置")
-                return
-            
-            # 获取Google表格配置
-            google_sheets_config = self.config_loader.get_google_sheets_config()
-            group_spreadsheets = google_sheets_config.get('group_spreadsheets', {})
-            
-            # 转换为列表以便分页
-            group_items = list(groups_config.items())
-            
-            # 计算分页
-            total_items = len(group_items)
-            total_pages = math.ceil(total_items / self.items_per_page)
-            start_index = page * self.items_per_page
-            end_index = min(start_index + self.items_per_page, total_items)
-            
-            # 构建消息头部（不分页的基本信息）
-            message = f"📊 Google表格配置 (第{page + 1}/{total_pages}页)\n━━━━━━━━━━━━━━━━\n"
-            message += f"📋 日报工作表: {google_sheets_config.get('daily_sheet_name', 'Daily-Report')}\n"
-            message += f"📋 时报工作表: {google_sheets_config.get('hourly_sheet_name', 'Hourly-Report')}\n"
-            message += f"🔑 凭据文件: {google_sheets_config.get('credentials_file', 'credentials.json')}\n\n"
-            message += "📝 代投组表格配置:\n"
-            
-            # 构建键盘
-            keyboard = []
-            
-            # 显示当前页的群组
-            for i in range(start_index, end_index):
-                group_name, group_config = group_items[i]
-                spreadsheet_id = group_spreadsheets.get(group_name, "未配置")
-                status = "✅" if spreadsheet_id != "未配置" else "❌"
-                display_id = spreadsheet_id if len(spreadsheet_id) <= 30 else f"{spreadsheet_id[:27]}..."
-                message += f"{status} {group_name}: {display_id}\n"
-                
-                # 为每个群组添加配置按钮
-                if spreadsheet_id == "未配置":
-                    keyboard.append([
-                        InlineKeyboardButton(f"📝 配置 {group_name}", callback_data=f"set_spreadsheet_{group_name}")
-                    ])
-                else:
-                    keyboard.append([
-                        InlineKeyboardButton(f"🔄 更新 {group_name}", callback_data=f"set_spreadsheet_{group_name}"),
-                        InlineKeyboardButton(f"🗑️ 删除 {group_name}", callback_data=f"remove_spreadsheet_{group_name}")
-                    ])
-            
-            # 添加分页按钮
-            if total_pages > 1:
-                page_buttons = []
-                if page > 0:
-                    page_buttons.append(InlineKeyboardButton("⬅️ 上一页", callback_data=f"google_sheets_page_{page - 1}"))
-                if page < total_pages - 1:
-                    page_buttons.append(InlineKeyboardButton("➡️ 下一页", callback_data=f"google_sheets_page_{page + 1}"))
-                if page_buttons:
-                    keyboard.append(page_buttons)
-            
-            # 添加返回按钮
-            keyboard.append([InlineKeyboardButton("🔙 返回主菜单", callback_data="back_to_main")])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(message, reply_markup=reply_markup)
-            logger.info(f"Google表格配置界面已显示 (第{page + 1}/{total_pages}页)")
+            text, reply_markup = self._render_google_sheets_menu(page)
+            await self._edit_if_changed(query, text, reply_markup=reply_markup)
+            logger.info("Google表格配置界面已显示 (第%s页)", page + 1)
             
         except Exception as e:
-            logger.error(f"处理Google表格配置请求失败: {str(e)}", exc_info=True)
+            logger.error("处理Google表格配置请求失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示Google表格配置界面失败: {str(e)}")
     
     async def _handle_set_spreadsheet_request(self, query, group_name: str) -> None:
         """处理设置表格ID请求"""
         try:
             user_id = query.from_user.id
-            logger.info(f"设置用户 {user_id} 等待输入群组 {group_name} 的表格ID")
+            logger.info("设置用户 %s 等待输入群组 %s 的表格ID", user_id, group_name)
             
             # 设置状态
             self.admin_state.set_waiting_for_spreadsheet_id(user_id, group_name)
             
-            keyboard = [[InlineKeyboardButton("🔙 返回配置菜单", callback_data="config_google_sheets")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
             await query.edit_message_text(
-                f"📊 配置Google表格\n━━━━━━━━━━━━━━━━\n"
+                f"📊 配置Google表格\n{_SEP}\n"
                 f"群组: {group_name}\n"
                 f"请输入Google表格ID：\n\n"
                 f"💡 提示：表格ID可以从Google表格URL中获取\n"
                 f"例如：https://docs.google.com/spreadsheets/d/1BxiMVs0XRA5nFMdKvBdBZjgmUUqptlbs74OgvE2upms/edit\n"
                 f"表格ID为：1BxiMVs0XRA5nFMdKvBdBZjgmUUqptlbs74OgvE2upms",
-                reply_markup=reply_markup
+                reply_markup=_BACK_CONFIG_MARKUP
             )
-            logger.info(f"设置群组 {group_name} 表格ID界面已显示")
+            logger.info("设置群组 %s 表格ID界面已显示", group_name)
             
         except Exception as e:
-            logger.error(f"处理设置表格ID请求失败: {str(e)}", exc_info=True)
+            logger.error("处理设置表格ID请求失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 显示设置表格ID界面失败: {str(e)}")
     
     async def _handle_remove_spreadsheet_request(self, query, group_name: str) -> None:
         """处理删除表格ID请求"""
         try:
             # 删除群组的表格ID配置
-            success = self.config_loader.remove_group_spreadsheet_id(group_name)
+            success = await self._run_config_write(self.config_loader.remove_group_spreadsheet_id, group_name)
             
             if success:
+                self._invalidate_config_cache()
                 await query.edit_message_text(
                     f"✅ 成功删除群组 {group_name} 的表格ID配置\n\n"
                     f"该群组将不再写入Google表格，但数据播报功能不受影响。",
-                    reply_markup=InlineKeyboardMarkup([[
-                        InlineKeyboardButton("🔙 返回配置菜单", callback_data="config_google_sheets")
-                    ]])
+                    reply_markup=_BACK_CONFIG_MARKUP
                 )
-                logger.info(f"成功删除群组 {group_name} 的表格ID配置")
+                logger.info("成功删除群组 %s 的表格ID配置", group_name)
             else:
                 await query.edit_message_text(
                     f"❌ 删除群组 {group_name} 的表格ID配置失败\n\n"
                     f"可能该群组未配置表格ID。",
-                    reply_markup=InlineKeyboardMarkup([[
-                        InlineKeyboardButton("🔙 返回配置菜单", callback_data="config_google_sheets")
-                    ]])
+                    reply_markup=_BACK_CONFIG_MARKUP
                 )
-                logger.warning(f"删除群组 {group_name} 的表格ID配置失败")
+                logger.warning("删除群组 %s 的表格ID配置失败", group_name)
             
         except Exception as e:
-            logger.error(f"处理删除表格ID请求失败: {str(e)}", exc_info=True)
+            logger.error("处理删除表格ID请求失败: %s", e, exc_info=True)
             await query.edit_message_text(f"❌ 删除表格ID配置失败: {str(e)}")
     
     async def _handle_spreadsheet_id_input(self, update: Update, spreadsheet_id: str) -> None:
@@ -1562,70 +1560,54 @@ class AdminHandler:
                 self.admin_state.clear_state(user_id)
                 return
             
-            # 验证表格ID格式（简单的长度和字符检查）
+            # 验证表格ID格式（长度和字符检查）
             spreadsheet_id = spreadsheet_id.strip()
-            if len(spreadsheet_id) < 20 or len(spreadsheet_id) > 50:
+            if not _SPREADSHEET_ID_RE.fullmatch(spreadsheet_id):
                 await update.message.reply_text("❌ 表格ID格式不正确，请检查后重新输入")
                 return
             
             # 设置群组的表格ID
-            success = self.config_loader.set_group_spreadsheet_id(group_name, spreadsheet_id)
+            success = await self._run_config_write(self.config_loader.set_group_spreadsheet_id, group_name, spreadsheet_id)
             
             if success:
+                self._invalidate_config_cache()
                 await update.message.reply_text(
                     f"✅ 成功设置群组 {group_name} 的表格ID：{spreadsheet_id}\n\n"
                     f"该群组的数据将自动写入Google表格。"
                 )
-                logger.info(f"成功设置群组 {group_name} 的表格ID: {spreadsheet_id}")
+                logger.info("成功设置群组 %s 的表格ID: %s", group_name, spreadsheet_id)
             else:
                 await update.message.reply_text(f"❌ 设置群组 {group_name} 的表格ID失败")
-                logger.error(f"设置群组 {group_name} 的表格ID失败")
+                logger.error("设置群组 %s 的表格ID失败", group_name)
             
             # 清除状态
             self.admin_state.clear_state(user_id)
             
-            # 延迟后返回Google表格配置菜单
-            await asyncio.sleep(2)
-            await self._back_to_google_sheets_config(update)
+            # 延迟后返回Google表格配置菜单（后台执行，不阻塞当前处理函数）
+            self._schedule_back_to_main(update, 2.0, back_to=self._back_to_google_sheets_config)
             
         except Exception as e:
-            logger.error(f"处理表格ID输入失败: {str(e)}", exc_info=True)
+            logger.error("处理表格ID输入失败: %s", e, exc_info=True)
             await update.message.reply_text(f"❌ 处理表格ID输入失败: {str(e)}")
             self.admin_state.clear_state(update.effective_user.id)
     
     async def _back_to_google_sheets_config(self, update_or_query) -> None:
-        """返回Google表格配置菜单"""
+        """返回Google表格配置菜单（回调查询编辑原消息，文本消息则回复新消息）"""
+        is_update = isinstance(update_or_query, Update)
         try:
             # 清除用户状态
-            if hasattr(update_or_query, 'from_user'):
-                # 是query对象
-                user_id = update_or_query.from_user.id
-                self.admin_state.clear_state(user_id)
-            elif hasattr(update_or_query, 'effective_user'):
-                # 是update对象
-                user_id = update_or_query.effective_user.id
-                self.admin_state.clear_state(user_id)
+            user = update_or_query.effective_user if is_update else update_or_query.from_user
+            self.admin_state.clear_state(user.id)
             
-            # 创建一个模拟的query对象来调用Google表格配置
-            if hasattr(update_or_query, 'message'):
-                # 是update对象，需要创建模拟query
-                class MockQuery:
-                    def __init__(self, message):
-                        self.message = message
-                        
-                    async def edit_message_text(self, text, reply_markup=None):
-                        # 发送新消息而不是编辑
-                        await self.message.reply_text(text, reply_markup=reply_markup)
-                
-                mock_query = MockQuery(update_or_query.message)
-                await self._handle_config_google_sheets_request(mock_query)
+            text, reply_markup = self._render_google_sheets_menu()
+            if is_update:
+                await update_or_query.message.reply_text(text, reply_markup=reply_markup)
             else:
-                # 是query对象，直接调用
-                await self._handle_config_google_sheets_request(update_or_query)
+                await self._edit_if_changed(update_or_query, text, reply_markup=reply_markup)
                 
         except Exception as e:
-            logger.error(f"返回Google表格配置菜单失败: {str(e)}", exc_info=True)
-            if hasattr(update_or_query, 'edit_message_text'):
-                await update_or_query.edit_message_text("❌ 返回Google表格配置菜单失败")
-            elif hasattr(update_or_query, 'message'):
-                await update_or_query.message.reply_text("❌ 返回Google表格配置菜单失败")
\ No newline at end of file
+            logger.error("返回Google表格配置菜单失败: %s", e, exc_info=True)
+            if is_update:
+                await update_or_query.message.reply_text("❌ 返回Google表格配置菜单失败")
+            else:
+                await update_or_query.edit_message_text("❌ 返回Google表格配置菜单失败")
\ No newline at end of file
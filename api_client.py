@@ -10,6 +10,7 @@
 # -------------------------------
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 from param_generator import ParamGenerator
 import urllib3
@@ -17,24 +18,41 @@ import urllib3
 # 禁用SSL警告（当ssl_verify=false时）
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# 测试数据中不属于请求参数的配置字段
+_EXCLUDE_EXACT = frozenset({'casename'})
+_EXCLUDE_PREFIX = ('expected_',)
+
+# 常见请求方法的规范写法，避免每次请求都调用 upper()
+_METHODS = {m.lower(): m for m in ('GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS')}
+_METHODS.update({m: m for m in _METHODS.values()})
+
 class ApiClient:
     def __init__(self, base_url, default_headers=None, config=None):
         self.base_url = base_url
         self.session = requests.Session()
+        # 每个客户端只访问一个主机，由 AuthManager 共享复用；
+        # 连接池按同时在途的少量请求（数据查询并发 + 登录重试）设置
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.default_headers = default_headers or {}
+        # 默认请求头挂到会话上，由 requests 与每次请求的请求头合并
+        self.session.headers.update(self.default_headers)
         self.config = config or {}
+        # SSL验证设置（仅当 api.ssl_verify 明确为 false 时关闭）
+        self._verify_ssl = (self.config.get('api') or {}).get('ssl_verify') is not False
         
-    def send_request(self, method, endpoint, params=None, data=None, headers=None):
+    def send_request(self, method, endpoint, params=None, data=None, headers=None, include_headers=False):
         url = f"{self.base_url}{endpoint}"
-        headers = {**self.default_headers, **(headers or {})}
-        
-        # 确保 data 是字典类型
-        request_data = {} if data is None else data.copy()
         
         # 从测试数据中提取请求参数，移除配置信息
         if isinstance(data, dict):
             request_data = {k: v for k, v in data.items() 
-                           if not k.startswith('expected_') and k != 'casename'}
+                           if k not in _EXCLUDE_EXACT and not k.startswith(_EXCLUDE_PREFIX)}
+        elif data is None:
+            request_data = {}
+        else:
+            request_data = data
         
         # 如果有自动生成参数配置，则处理
         if 'auto_generate' in request_data:
@@ -42,28 +60,29 @@ class ApiClient:
             request_data = ParamGenerator.add_common_params(request_data, auto_generate_config)
         
         try:
-            # 设置SSL验证
-            verify_ssl = True
-            if self.config.get('api', {}).get('ssl_verify') is False:
-                verify_ssl = False
-            
             response = self.session.request(
-                method=method.upper(),
+                method=_METHODS.get(method) or method.upper(),
                 url=url,
                 params=params,
                 json=request_data,
                 headers=headers,
                 timeout=10,
-                verify=verify_ssl
+                verify=self._verify_ssl
             )
             
-            try:
-                json_response = response.json() if response.content else {}
+            # 空响应体不解析；Content-Type 不是JSON且内容也不像JSON（如HTML错误页）时
+            # 直接返回 error，不再尝试解析；其余情况照常解析，解析失败同样返回 error
+            content = response.content
+            content_type = response.headers.get('Content-Type', '')
+            if content and 'json' not in content_type.lower() and content.lstrip()[:1] not in (b'{', b'['):
                 return {
                     'status_code': response.status_code,
-                    'response': json_response,
-                    'headers': dict(response.headers)
+                    'error': f"JSON解析错误: 响应类型为 {content_type or '未知'}",
+                    'response': {'message': '响应不是有效的JSON格式'},
+                    'raw_response': response.text
                 }
+            try:
+                json_response = response.json() if content else {}
             except ValueError as e:
                 return {
                     'status_code': response.status_code,
@@ -71,6 +90,15 @@ class ApiClient:
                     'response': {'message': '响应不是有效的JSON格式'},
                     'raw_response': response.text
                 }
+            result = {
+                'status_code': response.status_code,
+                'response': json_response
+            }
+            
+            # 调用方需要时才复制响应头
+            if include_headers:
+                result['headers'] = dict(response.headers)
+            return result
         except requests.exceptions.ConnectionError as e:
             return {
                 'status_code': 503,
@@ -83,13 +111,21 @@ class ApiClient:
                 'error': f"请求超时: {str(e)}",
                 'response': {'message': '请求超时'}
             }
+        except RequestException as e:
+            return {
+                'status_code': 500,
+                'error': f"请求异常: {str(e)}",
+                'response': {'message': '请求失败'}
+            }
+        except ValueError as e:
+            return {
+                'status_code': 500,
+                'error': f"参数错误: {str(e)}",
+                'response': {'message': '请求参数无效'}
+            }
         except Exception as e:
             return {
                 'status_code': 500,
                 'error': str(e),
                 'response': {'message': '系统错误'}
             }
-        except RequestException as e:
-            return {'error': str(e)}
-        except ValueError:
-            return {'error': 'Invalid JSON response'}
@@ -1,16 +1,60 @@
 import asyncio
 import logging
+import ssl
+import hmac
+import json
+import random
+import struct
 import aiohttp
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import pytz
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, NamedTuple, Optional
 import pyotp
 import time
+from telegram.error import RetryAfter
 from param_generator import ParamGenerator
+from utils import INDIA_TZ, RateLimiter, global_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# 包分析数据字段到原接口字段的映射：(源字段, 目标字段, 默认值)
+_FIELD_MAP = (
+    ('newMemberCount', 'register', 0),
+    ('newMemberRechargeCount', 'new_charge_user', 0),
+    ('newMemberRechargeAmount', 'new_charge', 0),
+    ('rechargeAmount', 'charge_total', 0),
+    ('withdrawAmount', 'withdraw_total', 0),
+    ('chargeWithdrawDiff', 'charge_withdraw_diff', 0),
+)
+
+# 安装了 orjson 时用它做 JSON 编解码（C 实现，解析大批量数据更快），否则使用标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# SSL上下文在导入时创建一次（加载CA证书涉及磁盘读取），避免在事件循环中反复创建
+_SHARED_SSL_CTX_VERIFY = ssl.create_default_context()
+_SHARED_SSL_CTX_NOVERIFY = ssl.create_default_context()
+_SHARED_SSL_CTX_NOVERIFY.check_hostname = False
+_SHARED_SSL_CTX_NOVERIFY.verify_mode = ssl.CERT_NONE
+
 class ApiDataReader:
+    # 登录成功响应中token所在的路径
+    _DATA_TOKEN_PATH = ('data', 'token')
+    _RESPONSE_TOKEN_PATH = ('response', 'data', 'token')
+    
+    # 实例属性固定，使用 __slots__ 减少内存占用并加快属性访问
+    __slots__ = (
+        'api_url', 'api_token', 'config_loader', 'headers',
+        'channel_name_to_value_map', '_map_expiry', '_map_lock', 'india_tz',
+        '_day_cache', '_hour_cache', 'login_token', 'token_expiry',
+        '_session', '_totp_cache', '_target_channels_cache',
+    )
+    
     def __init__(self, api_url: str, api_token: str, config_loader=None):
         """初始化 API 数据读取器
         
@@ -27,32 +71,94 @@ class ApiDataReader:
         }
         # 缓存渠道组映射关系
         self.channel_name_to_value_map = {}
+        # 映射关系的过期时间（time.monotonic()），以及防止并发重复拉取的锁
+        self._map_expiry: float = 0.0
+        self._map_lock = asyncio.Lock()
         # 设置印度时区
-        self.india_tz = pytz.timezone('Asia/Kolkata')
+        self.india_tz = INDIA_TZ
+        # 印度时区日期/小时字符串缓存：(失效时间戳, ...)，跨天/跨小时后重新计算
+        self._day_cache: tuple = (float("-inf"), '', '')
+        self._hour_cache: tuple = (float("-inf"), None, {})
         # 登录相关
         self.login_token = None
         self.token_expiry = None
+        # 复用的 HTTP 会话（连接池和 keep-alive 在各请求间共享），首次使用时创建
+        self._session: Optional[aiohttp.ClientSession] = None
+        # 按密钥缓存的TOTP对象
+        self._totp_cache: Dict[str, pyotp.TOTP] = {}
+        # 配置中的目标渠道集合，按 config_loader.get_groups_ordered() 的结果缓存
+        self._target_channels_cache: Optional[tuple] = None
         
         # 启动时尝试从文件加载token
         if self.config_loader:
             self._load_token_on_startup()
     
+    @classmethod
+    def _login_token_path(cls, result: Dict[str, Any]) -> Optional[tuple]:
+        """根据登录响应格式返回token所在路径，不是登录成功的响应时返回 None
+        
+        兼容的成功格式：
+        - {success: true, code: 200, data: {token: ...}}
+        - {code: 0, msg: 'Succeed', data: {token: ...}}
+        - {response: {data: {token: ...}}}
+        """
+        if result.get('success') and result.get('code') == 200:
+            return cls._DATA_TOKEN_PATH
+        if result.get('code') == 0 and result.get('msg') == 'Succeed':
+            return cls._DATA_TOKEN_PATH
+        response = result.get('response')
+        if isinstance(response, dict) and isinstance(response.get('data'), dict) and 'token' in response['data']:
+            return cls._RESPONSE_TOKEN_PATH
+        return None
+    
     def _create_ssl_connector(self):
-        """创建SSL连接器
+        """创建SSL连接器（复用模块级的SSL上下文）
         
         Returns:
-            aiohttp.TCPConnector 或 None
+            aiohttp.TCPConnector
         """
+        ssl_context = _SHARED_SSL_CTX_VERIFY
         if self.config_loader and hasattr(self.config_loader, 'get_ssl_verify'):
-            ssl_verify = self.config_loader.get_ssl_verify()
-            if not ssl_verify:
-                import ssl
-                ssl_context = ssl.create_default_context()
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = ssl.CERT_NONE
+            if not self.config_loader.get_ssl_verify():
                 logger.warning("SSL证书验证已禁用，这可能存在安全风险")
-                return aiohttp.TCPConnector(ssl=ssl_context)
-        return None
+                ssl_context = _SHARED_SSL_CTX_NOVERIFY
+        # 同一主机的登录和数据请求复用连接：缓存DNS，保持空闲连接，及时清理已关闭的TLS连接
+        return aiohttp.TCPConnector(
+            ssl=ssl_context,
+            limit=50,
+            limit_per_host=20,
+            use_dns_cache=True,
+            ttl_dns_cache=600,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True
+        )
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取复用的 HTTP 会话，不存在或已关闭时重新创建"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=self._create_ssl_connector(),
+                timeout=aiohttp.ClientTimeout(total=30),
+                json_serialize=_json_dumps
+            )
+        return self._session
+    
+    async def aclose(self):
+        """关闭复用的 HTTP 会话"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def __aenter__(self):
+        """支持 async with ApiDataReader(...) as reader，退出时关闭 HTTP 会话
+        
+        常驻的实例（如 ApiDataSenderManager、UserCommandHandler 中的）在停止时调用 aclose()
+        """
+        await self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
     
     def _load_token_on_startup(self):
         """启动时从文件加载token"""
@@ -103,6 +209,13 @@ class ApiDataReader:
             logger.error(f"实例健康检查时出错: {str(e)}")
             return False
     
+    def _totp(self, secret: str) -> pyotp.TOTP:
+        """获取密钥对应的TOTP对象（按密钥缓存）"""
+        totp = self._totp_cache.get(secret)
+        if totp is None:
+            totp = self._totp_cache[secret] = pyotp.TOTP(secret)
+        return totp
+    
     def generate_totp_code(self, secret: str) -> str:
         """生成TOTP验证码
         
@@ -112,8 +225,7 @@ class ApiDataReader:
         Returns:
             6位数字验证码
         """
-        totp = pyotp.TOTP(secret)
-        return totp.now()
+        return self._totp(secret).now()
     
     def generate_totp_codes_with_offsets(self, secret: str) -> list:
         """生成多个时间窗口的TOTP验证码
@@ -124,14 +236,22 @@ class ApiDataReader:
         Returns:
             包含不同时间偏移验证码的列表
         """
-        totp = pyotp.TOTP(secret)
+        totp = self._totp(secret)
         current_time = time.time()
         codes = []
         
+        # 密钥只初始化一次HMAC，各时间窗口复制后追加计数器（与 pyotp 的 RFC 6238 算法一致）
+        base_hmac = hmac.new(totp.byte_secret(), digestmod=totp.digest)
+        digits, interval = totp.digits, totp.interval
+        
         # 生成前后几个时间窗口的验证码 (每个窗口30秒)
         for offset in [-5, -4, -3, -2, -1, 0, 1, 2]:
             timestamp = current_time + (offset * 30)
-            code = totp.at(timestamp)
+            h = base_hmac.copy()
+            h.update(struct.pack('>Q', int(timestamp) // interval))
+            digest = h.digest()
+            pos = digest[-1] & 0x0F
+            code = str((struct.unpack_from('>I', digest, pos)[0] & 0x7FFFFFFF) % 10 ** digits).zfill(digits)
             codes.append({
                 'offset': offset,
                 'code': code,
@@ -175,52 +295,110 @@ class ApiDataReader:
                 'Domainurl': login_config.get('url', '').replace('/api/Login/Login', '')
             }
             
-            connector = self._create_ssl_connector()
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.post(
-                    login_config.get('url', ''),
-                    json=login_data,
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.debug(f"登录响应: {result}")
-                        
-                        # 检查响应格式（兼容不同的API响应格式）
-                        if result.get('success') and result.get('code') == 200:
-                            # 格式1: {success: true, code: 200, data: {token: ...}}
-                            token = result.get('data', {}).get('token')
-                        elif result.get('code') == 0 and result.get('msg') == 'Succeed':
-                            # 格式2: {code: 0, msg: 'Succeed', data: {token: ...}}
-                            token = result.get('data', {}).get('token')
-                        elif 'response' in result and 'data' in result['response'] and 'token' in result['response']['data']:
-                            # 格式3: {response: {data: {token: ...}}}
-                            token = result['response']['data']['token']
-                        else:
-                            # 检查错误信息
-                            error_msg = result.get('message') or result.get('msg') or result.get('response', {}).get('msg', '未知错误')
-                            logger.error(f"登录失败: {error_msg}")
-                            return None
-                        
-                        if token and token.strip():
-                            logger.info(f"使用验证码 {totp_code} 登录成功")
-                            return token
-                        else:
-                            logger.error("登录响应中未找到有效token")
-                            return None
+            session = await self._get_session()
+            async with session.post(
+                login_config.get('url', ''),
+                json=login_data,
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    result = await response.json(loads=_json_loads)
+                    logger.debug("登录响应: %s", result)
+                    
+                    # 先按响应格式确认登录成功，再按对应路径取token
+                    path = self._login_token_path(result)
+                    if path is None:
+                        # 检查错误信息
+                        error_msg = result.get('message') or result.get('msg') or result.get('response', {}).get('msg', '未知错误')
+                        logger.error(f"登录失败: {error_msg}")
+                        return None
+                    
+                    token = result
+                    for key in path:
+                        token = token.get(key) if isinstance(token, dict) else None
+                    
+                    if isinstance(token, str) and token.strip():
+                        logger.info(f"使用验证码 {totp_code} 登录成功")
+                        return token
                     else:
-                        logger.error(f"登录请求失败，状态码: {response.status}")
-                        response_text = await response.text()
-                        logger.error(f"响应内容: {response_text}")
+                        logger.error("登录响应中未找到有效token")
                         return None
-                        
+                else:
+                    logger.error(f"登录请求失败，状态码: {response.status}")
+                    response_text = await response.text()
+                    logger.error(f"响应内容: {response_text}")
+                    return None
+                    
         except Exception as e:
             logger.error(f"尝试登录时出错: {str(e)}", exc_info=True)
             return None
 
-    async def login_and_get_token(self) -> Optional[str]:
+    async def _first_successful_login(self, login_config: dict, codes_info: list,
+                                      min_backoff: float = 0.1, max_backoff: float = 1.5) -> tuple:
+        """并发使用多个验证码尝试登录，任一成功后取消其余尝试
+        
+        第 n 次尝试先等待 min(max_backoff, min_backoff * 2**n) 秒加少量随机抖动，
+        且同时进行的登录请求不超过 3 个，避免瞬间打满登录接口触发限流。
+        
+        Args:
+            login_config: 登录配置
+            codes_info: 待尝试的验证码列表（generate_totp_codes_with_offsets 的结果，已去掉尝试过的验证码）
+            min_backoff: 最小退避时间（秒）
+            max_backoff: 最大退避时间（秒）
+            
+        Returns:
+            (登录token, 对应的验证码信息)，全部失败时返回 (None, None)
+        """
+        semaphore = asyncio.Semaphore(3)
+        
+        async def attempt(attempt_no: int, code_info: dict) -> Optional[str]:
+            await asyncio.sleep(min(max_backoff, min_backoff * 2 ** attempt_no) + random.uniform(0, 0.05))
+            async with semaphore:
+                logger.info(f"尝试偏移 {code_info['offset']} 的验证码: {code_info['code']}")
+                return await self.try_login_with_code(login_config, code_info['code'])
+        
+        pending = {
+            asyncio.create_task(attempt(attempt_no, code_info)): code_info
+            for attempt_no, code_info in enumerate(codes_info)
+        }
+        
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    code_info = pending.pop(task)
+                    token = task.result()
+                    if token:
+                        return token, code_info
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        return None, None
+    
+    def _save_login_token(self, token: str) -> bool:
+        """记录登录成功获取的token，同步到AuthManager缓存并保存到文件
+        
+        Returns:
+            是否保存到文件成功
+        """
+        self.login_token = token
+        self.token_expiry = time.time() + 24 * 3600
+        
+        # 同步更新AuthManager的token缓存
+        from auth_manager import AuthManager
+        AuthManager._token_cache["main_login_token"] = token
+        logger.debug("已同步更新AuthManager token缓存")
+        
+        return self.config_loader.save_token_to_file(token, self.token_expiry)
+    
+    async def login_and_get_token(self, min_backoff: float = 0.1, max_backoff: float = 1.5) -> Optional[str]:
         """登录并获取token（支持多时间窗口重试）
         
+        Args:
+            min_backoff: 其他时间窗口重试的最小退避时间（秒）
+            max_backoff: 其他时间窗口重试的最大退避时间（秒）
+            
         Returns:
             登录token，如果失败返回None
         """
@@ -252,45 +430,28 @@ class ApiDataReader:
             token = await self.try_login_with_code(login_config, current_code)
             if token:
                 # 登录成功，保存token
-                self.login_token = token
-                self.token_expiry = time.time() + 24 * 3600
-                
-                # 同步更新AuthManager的token缓存
-                from auth_manager import AuthManager
-                AuthManager._token_cache["main_login_token"] = token
-                logger.debug("已同步更新AuthManager token缓存")
-                
-                if self.config_loader.save_token_to_file(token, self.token_expiry):
+                if self._save_login_token(token):
                     logger.info("登录成功，已获取新token并保存到文件")
                 else:
                     logger.warning("登录成功，但保存token到文件失败")
                 
                 return token
             
-            # 如果当前时间验证码失败，尝试其他时间窗口的验证码
+            # 如果当前时间验证码失败，并发尝试其他时间窗口的验证码
             logger.info("当前验证码登录失败，尝试其他时间窗口的验证码...")
-            for code_info in codes_info:
-                if code_info['code'] == current_code:
-                    continue  # 跳过已经尝试过的当前验证码
+            # 跳过已经尝试过的当前验证码
+            remaining = [code_info for code_info in codes_info if code_info['code'] != current_code]
+            token, code_info = await self._first_successful_login(
+                login_config, remaining, min_backoff, max_backoff
+            )
+            if token:
+                # 登录成功，保存token
+                if self._save_login_token(token):
+                    logger.info(f"使用偏移 {code_info['offset']} 的验证码登录成功，已保存token")
+                else:
+                    logger.warning("登录成功，但保存token到文件失败")
                 
-                logger.info(f"尝试偏移 {code_info['offset']} 的验证码: {code_info['code']}")
-                token = await self.try_login_with_code(login_config, code_info['code'])
-                if token:
-                    # 登录成功，保存token
-                    self.login_token = token
-                    self.token_expiry = time.time() + 24 * 3600
-                    
-                    # 同步更新AuthManager的token缓存
-                    from auth_manager import AuthManager
-                    AuthManager._token_cache["main_login_token"] = token
-                    logger.debug("已同步更新AuthManager token缓存")
-                    
-                    if self.config_loader.save_token_to_file(token, self.token_expiry):
-                        logger.info(f"使用偏移 {code_info['offset']} 的验证码登录成功，已保存token")
-                    else:
-                        logger.warning("登录成功，但保存token到文件失败")
-                    
-                    return token
+                return token
             
             logger.error("所有时间窗口的验证码都尝试失败")
             return None
@@ -315,9 +476,9 @@ class ApiDataReader:
         current_time = time.time()
         is_expired = current_time > self.token_expiry
         if is_expired:
-            logger.debug(f"Token已过期，当前时间: {current_time}, 过期时间: {self.token_expiry}")
+            logger.debug("Token已过期，当前时间: %s, 过期时间: %s", current_time, self.token_expiry)
         else:
-            logger.debug(f"Token仍然有效，当前时间: {current_time}, 过期时间: {self.token_expiry}")
+            logger.debug("Token仍然有效，当前时间: %s, 过期时间: %s", current_time, self.token_expiry)
         return is_expired
     
     async def ensure_valid_token(self) -> bool:
@@ -343,6 +504,23 @@ class ApiDataReader:
             logger.debug("Token仍然有效，无需重新登录")
             return True
     
+    def _get_india_day_strings(self) -> tuple:
+        """获取印度时区今天和昨天的日期字符串，当天内直接返回缓存结果
+        
+        Returns:
+            (今天, 昨天)，格式为 YYYY-MM-DD
+        """
+        cache = self._day_cache
+        if time.time() >= cache[0]:
+            india_now = datetime.now(self.india_tz)
+            midnight = india_now.replace(hour=0, minute=0, second=0, microsecond=0)
+            cache = self._day_cache = (
+                midnight.timestamp() + 86400,
+                india_now.strftime('%Y-%m-%d'),
+                (india_now - timedelta(days=1)).strftime('%Y-%m-%d')
+            )
+        return cache[1], cache[2]
+    
     def get_india_date(self, date_obj: datetime = None) -> str:
         """获取印度时区的日期字符串
         
@@ -353,17 +531,13 @@ class ApiDataReader:
             印度时区的日期字符串，格式为 YYYY-MM-DD
         """
         if date_obj is None:
-            india_now = datetime.now(self.india_tz)
-        else:
-            # 将输入的日期对象转换为印度时区
-            if date_obj.tzinfo is None:
-                # 如果日期对象没有时区信息，假设为UTC
-                utc_dt = pytz.utc.localize(date_obj)
-            else:
-                utc_dt = date_obj.astimezone(pytz.utc)
-            india_now = utc_dt.astimezone(self.india_tz)
+            return self._get_india_day_strings()[0]
         
-        return india_now.strftime('%Y-%m-%d')
+        # 将输入的日期对象转换为印度时区
+        if date_obj.tzinfo is None:
+            # 如果日期对象没有时区信息，假设为UTC
+            date_obj = date_obj.replace(tzinfo=timezone.utc)
+        return date_obj.astimezone(self.india_tz).strftime('%Y-%m-%d')
     
     def get_india_datetime(self) -> datetime:
         """获取印度时区的当前时间
@@ -379,8 +553,7 @@ class ApiDataReader:
         Returns:
             印度时区的昨天日期字符串，格式为 YYYY-MM-DD
         """
-        india_yesterday = datetime.now(self.india_tz) - timedelta(days=1)
-        return india_yesterday.strftime('%Y-%m-%d')
+        return self._get_india_day_strings()[1]
     
     def get_india_hour(self, hours_ago: int = 0) -> str:
         """获取印度时区的特定小时时间
@@ -391,10 +564,17 @@ class ApiDataReader:
         Returns:
             印度时区的特定小时时间字符串，格式为 YYYY-MM-DD HH:00:00
         """
-        india_time = datetime.now(self.india_tz) - timedelta(hours=hours_ago)
-        # 将分钟和秒设置为0，只保留小时
-        india_time = india_time.replace(minute=0, second=0, microsecond=0)
-        return india_time.strftime('%Y-%m-%d %H:%M:%S')
+        cache = self._hour_cache
+        if time.time() >= cache[0]:
+            # 将分钟和秒设置为0，只保留小时；同一小时内的结果按 hours_ago 缓存
+            hour_start = datetime.now(self.india_tz).replace(minute=0, second=0, microsecond=0)
+            cache = self._hour_cache = (hour_start.timestamp() + 3600, hour_start, {})
+        
+        hour_strings = cache[2]
+        hour_str = hour_strings.get(hours_ago)
+        if hour_str is None:
+            hour_str = hour_strings[hours_ago] = (cache[1] - timedelta(hours=hours_ago)).strftime('%Y-%m-%d %H:%M:%S')
+        return hour_str
     
     async def get_package_list(self) -> Optional[dict]:
         """获取包列表数据"""
@@ -417,8 +597,9 @@ class ApiDataReader:
             # 从auth_manager导入验签功能
             from auth_manager import AuthManager
             
-            # 使用认证管理器发送带认证和验签的请求
-            response = AuthManager.send_authenticated_request(
+            # 使用认证管理器发送带认证和验签的请求（同步 requests 调用，放到线程池中执行避免阻塞事件循环）
+            response = await asyncio.to_thread(
+                AuthManager.send_authenticated_request,
                 endpoint='/api/Package/GetPageList',
                 data=request_data,
                 method='POST',
@@ -464,8 +645,9 @@ class ApiDataReader:
             # 从auth_manager导入验签功能
             from auth_manager import AuthManager
             
-            # 使用认证管理器发送带认证和验签的请求
-            response = AuthManager.send_authenticated_request(
+            # 使用认证管理器发送带认证和验签的请求（同步 requests 调用，放到线程池中执行避免阻塞事件循环）
+            response = await asyncio.to_thread(
+                AuthManager.send_authenticated_request,
                 endpoint='/api/RptDataAnalysis/GetPackageAnalysis',
                 data=request_data,
                 method='POST',
@@ -504,14 +686,24 @@ class ApiDataReader:
             
             logger.info(f"开始处理包数据，目标日期: {report_date}")
             
-            # 1. 获取包列表，建立ID和包名的对应关系
-            package_list_response = await self.get_package_list()
+            # 先确保token有效，再并发获取包列表和包分析数据（两个请求互不依赖）
+            if not await self.ensure_valid_token():
+                logger.error("无法获取有效token")
+                return []
+            
+            package_list_response, analysis_response = await asyncio.gather(
+                self.get_package_list(),
+                self.get_package_analysis(report_date, report_date)
+            )
+            
+            # 1. 根据包列表建立ID和包名的对应关系
             if not package_list_response:
                 logger.error("无法获取包列表数据")
                 return []
             
             # 从响应中提取数据，支持不同的响应格式
-            logger.debug(f"包列表响应结构: {list(package_list_response.keys()) if package_list_response else 'None'}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("包列表响应结构: %s", list(package_list_response.keys()))
             
             package_data = None
             if 'response' in package_list_response and 'data' in package_list_response['response']:
@@ -531,18 +723,17 @@ class ApiDataReader:
                 return []
             
             # 建立ID到包名的映射
-            id_to_package_name = {}
             package_list = package_data.get('list', [])
-            for package in package_list:
-                package_id = package.get('id')
-                package_name = package.get('channelPackageName')
-                if package_id is not None and package_name:
-                    id_to_package_name[package_id] = package_name
+            id_to_package_name = {
+                package_id: package_name
+                for package in package_list
+                if (package_id := package.get('id')) is not None
+                and (package_name := package.get('channelPackageName'))
+            }
             
             logger.info(f"建立了 {len(id_to_package_name)} 个包的ID映射关系")
             
-            # 2. 获取包分析数据
-            analysis_response = await self.get_package_analysis(report_date, report_date)
+            # 2. 包分析数据
             if not analysis_response or 'data' not in analysis_response:
                 logger.error("无法获取包分析数据")
                 return []
@@ -551,44 +742,34 @@ class ApiDataReader:
             logger.info(f"获取到 {len(analysis_list)} 条分析数据")
             
             # 3. 获取配置中的渠道列表
-            groups_config = self.config_loader.get_groups_config()
-            target_channels = set()
-            for group_name, group_config in groups_config.items():
-                channel_ids = group_config.get('channel_ids', [])
-                for channel_config in channel_ids:
-                    channel_id = channel_config.get('id', '')
-                    if channel_id:
-                        target_channels.add(channel_id)
+            target_channels = self._get_target_channels()
             
             logger.info(f"配置中的目标渠道: {target_channels}")
             
             # 4. 转换数据格式以保持与原接口的兼容性
             converted_data = []
+            get_mapped_name = id_to_package_name.get
             for analysis_item in analysis_list:
                 package_id = analysis_item.get('packageId')
-                package_name = analysis_item.get('packageName', '')
+                raw_package_name = analysis_item.get('packageName', '')
                 
                 # 如果packageId存在于映射中，使用映射的名称，否则使用原始名称
-                if package_id in id_to_package_name:
-                    mapped_package_name = id_to_package_name[package_id]
-                    logger.debug(f"包ID {package_id} 映射: {package_name} -> {mapped_package_name}")
-                    package_name = mapped_package_name
+                package_name = get_mapped_name(package_id, raw_package_name)
+                
+                # 不匹配配置中渠道的数据直接跳过（大部分数据属于这种情况）
+                if package_name not in target_channels:
+                    continue
+                
+                if package_name is not raw_package_name:
+                    logger.debug("包ID %s 映射: %s -> %s", package_id, raw_package_name, package_name)
                 
-                # 检查是否匹配配置中的渠道
-                if package_name in target_channels:
-                    # 转换为与原接口兼容的格式
-                    converted_item = {
-                        'create_time': report_date,
-                        'channel': package_name,
-                        'register': analysis_item.get('newMemberCount', 0),
-                        'new_charge_user': analysis_item.get('newMemberRechargeCount', 0),
-                        'new_charge': analysis_item.get('newMemberRechargeAmount', 0),  # 使用正确的字段
-                        'charge_total': analysis_item.get('rechargeAmount', 0),
-                        'withdraw_total': analysis_item.get('withdrawAmount', 0),
-                        'charge_withdraw_diff': analysis_item.get('chargeWithdrawDiff', 0)
-                    }
-                    converted_data.append(converted_item)
-                    logger.debug(f"匹配到渠道数据: {package_name}")
+                # 转换为与原接口兼容的格式
+                converted_item = {'create_time': report_date, 'channel': package_name}
+                item_get = analysis_item.get
+                for source_key, target_key, default in _FIELD_MAP:
+                    converted_item[target_key] = item_get(source_key, default)
+                converted_data.append(converted_item)
+                logger.debug("匹配到渠道数据: %s", package_name)
             
             logger.info(f"最终匹配到 {len(converted_data)} 条数据")
             return converted_data
@@ -597,6 +778,39 @@ class ApiDataReader:
             logger.error(f"读取包数据时出错: {str(e)}")
             return []
     
+    async def _post_json(self, session: aiohttp.ClientSession, url: str, data: dict) -> tuple:
+        """使用当前登录token发送 JSON POST 请求
+        
+        Returns:
+            (状态码, 响应内容)，状态码为200时响应内容为解析后的JSON，否则为响应文本
+        """
+        headers = {
+            'Authorization': f'Bearer {self.login_token}',
+            'Content-Type': 'application/json'
+        }
+        async with session.post(url, json=data, headers=headers) as response:
+            if response.status == 200:
+                return response.status, await response.json(loads=_json_loads)
+            return response.status, await response.text()
+    
+    def _get_target_channels(self) -> frozenset:
+        """获取配置中所有群组的渠道ID集合
+        
+        ConfigLoader 在保存或重新加载配置时才会重建 get_groups_ordered() 的列表，
+        因此以该列表对象本身作为版本标识，配置未变时直接复用上次构建的集合。
+        """
+        groups_ordered = self.config_loader.get_groups_ordered()
+        cache = self._target_channels_cache
+        if cache is None or cache[0] is not groups_ordered:
+            target_channels = frozenset(
+                channel_id
+                for _, group_config in groups_ordered
+                for channel_config in group_config.get('channel_ids', [])
+                if (channel_id := channel_config.get('id', ''))
+            )
+            cache = self._target_channels_cache = (groups_ordered, target_channels)
+        return cache[1]
+    
     async def read_data_old(self, report_date: str = None, report_type: int = 0, 
                        start_time: str = None, end_time: str = None) -> List[Dict[str, Any]]:
         """从 API 读取数据
@@ -638,89 +852,41 @@ class ApiDataReader:
             logger.info(f"正在获取数据，日期: {report_date}")
             
             # 发送请求
-            headers = {
-                'Authorization': f'Bearer {self.login_token}',
-                'Content-Type': 'application/json'
-            }
+            url = data_config.get('url', '')
+            session = await self._get_session()
+            status, result = await self._post_json(session, url, request_data)
+            
+            if status == 200:
+                if result.get('success') and result.get('code') == 200:
+                    items = result.get('data', {}).get('items', [])
+                    logger.info(f"成功获取数据，共 {len(items)} 条记录")
+                    return items
+                logger.error(f"API返回错误: {result.get('message', '未知错误')}")
+                token_expired = result.get('code') == 401
+            else:
+                logger.error(f"数据请求失败，状态码: {status}")
+                token_expired = status == 401
             
-            connector = self._create_ssl_connector()
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.post(
-                    data_config.get('url', ''),
-                    json=request_data,
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
+            # 如果是token过期（业务码或HTTP状态码为401），重新登录后重试一次
+            if token_expired:
+                logger.info("Token可能过期，尝试重新登录")
+                # 重置token状态避免状态污染
+                self._reset_token_state()
+                if await self.login_and_get_token():
+                    # 直接重新发送请求，而不是递归调用
+                    logger.info("重新登录成功，重新尝试数据请求")
+                    status, result = await self._post_json(session, url, request_data)
+                    if status == 200:
                         if result.get('success') and result.get('code') == 200:
                             items = result.get('data', {}).get('items', [])
-                            logger.info(f"成功获取数据，共 {len(items)} 条记录")
+                            logger.info(f"重新登录后成功获取数据，共 {len(items)} 条记录")
                             return items
-                        else:
-                            logger.error(f"API返回错误: {result.get('message', '未知错误')}")
-                            # 如果是token过期，尝试重新登录
-                            if result.get('code') == 401:
-                                logger.info("Token可能过期，尝试重新登录")
-                                # 重置token状态避免状态污染
-                                self._reset_token_state()
-                                if await self.login_and_get_token():
-                                    # 重新尝试请求，但避免无限递归
-                                    logger.info("重新登录成功，重新尝试数据请求")
-                                    # 直接重新发送请求，而不是递归调用
-                                    headers = {
-                                        'Authorization': f'Bearer {self.login_token}',
-                                        'Content-Type': 'application/json'
-                                    }
-                                    async with session.post(
-                                        data_config.get('url', ''),
-                                        json=request_data,
-                                        headers=headers
-                                    ) as retry_response:
-                                        if retry_response.status == 200:
-                                            retry_result = await retry_response.json()
-                                            if retry_result.get('success') and retry_result.get('code') == 200:
-                                                items = retry_result.get('data', {}).get('items', [])
-                                                logger.info(f"重新登录后成功获取数据，共 {len(items)} 条记录")
-                                                return items
-                                            else:
-                                                logger.error(f"重新登录后API仍返回错误: {retry_result.get('message', '未知错误')}")
-                                        else:
-                                            logger.error(f"重新登录后数据请求仍失败，状态码: {retry_response.status}")
-                                else:
-                                    logger.error("重新登录失败，清除token状态")
-                                    self._reset_token_state()
+                        logger.error(f"重新登录后API仍返回错误: {result.get('message', '未知错误')}")
                     else:
-                        logger.error(f"数据请求失败，状态码: {response.status}")
-                        # 如果是401错误，也尝试重新登录
-                        if response.status == 401:
-                            logger.info("HTTP 401错误，尝试重新登录")
-                            # 重置token状态避免状态污染
-                            self._reset_token_state()
-                            if await self.login_and_get_token():
-                                logger.info("重新登录成功，重新尝试数据请求")
-                                # 直接重新发送请求
-                                headers = {
-                                    'Authorization': f'Bearer {self.login_token}',
-                                    'Content-Type': 'application/json'
-                                }
-                                async with session.post(
-                                    data_config.get('url', ''),
-                                    json=request_data,
-                                    headers=headers
-                                ) as retry_response:
-                                    if retry_response.status == 200:
-                                        retry_result = await retry_response.json()
-                                        if retry_result.get('success') and retry_result.get('code') == 200:
-                                            items = retry_result.get('data', {}).get('items', [])
-                                            logger.info(f"重新登录后成功获取数据，共 {len(items)} 条记录")
-                                            return items
-                                        else:
-                                            logger.error(f"重新登录后API仍返回错误: {retry_result.get('message', '未知错误')}")
-                                    else:
-                                        logger.error(f"重新登录后数据请求仍失败，状态码: {retry_response.status}")
-                            else:
-                                logger.error("重新登录失败，清除token状态")
-                                self._reset_token_state()
+                        logger.error(f"重新登录后数据请求仍失败，状态码: {status}")
+                else:
+                    logger.error("重新登录失败，清除token状态")
+                    self._reset_token_state()
                         
         except Exception as e:
             logger.error(f"读取数据时出错: {str(e)}", exc_info=True)
@@ -749,25 +915,24 @@ class ApiDataReader:
             
             logger.info("开始获取渠道组信息")
             
-            connector = self._create_ssl_connector()
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.post(self.api_url, json=params, headers=self.headers) as response:
-                    if response.status != 200:
-                        logger.error(f"API 请求失败，状态码: {response.status}")
-                        return []
-                    
-                    data = await response.json()
-                    
-                    # 检查响应格式
-                    if data.get('code') != 0 or 'data' not in data:
-                        logger.error(f"API 响应格式错误: {data}")
-                        return []
-                    
-                    # 获取渠道组信息
-                    channel_groups = data['data'].get('channelGroup', [])
-                    logger.info(f"获取到渠道组信息: {len(channel_groups)} 个渠道")
-                    
-                    return channel_groups
+            session = await self._get_session()
+            async with session.post(self.api_url, json=params, headers=self.headers) as response:
+                if response.status != 200:
+                    logger.error(f"API 请求失败，状态码: {response.status}")
+                    return []
+                
+                data = await response.json(loads=_json_loads)
+                
+                # 检查响应格式
+                if data.get('code') != 0 or 'data' not in data:
+                    logger.error(f"API 响应格式错误: {data}")
+                    return []
+                
+                # 获取渠道组信息
+                channel_groups = data['data'].get('channelGroup', [])
+                logger.info(f"获取到渠道组信息: {len(channel_groups)} 个渠道")
+                
+                return channel_groups
         
         except Exception as e:
             logger.error(f"获取渠道组信息时出错: {str(e)}")
@@ -782,15 +947,14 @@ class ApiDataReader:
         try:
             channel_groups = await self.get_channel_groups()
             
-            # 构建映射关系
-            self.channel_name_to_value_map = {}
-            for channel in channel_groups:
-                channel_name = channel.get('name', '').strip()
-                channel_value = channel.get('value', '').strip()
-                
-                # 跳过空的或者"请选择渠道ID"这样的默认项
-                if channel_name and channel_value and channel_name != "请选择渠道ID":
-                    self.channel_name_to_value_map[channel_name] = channel_value
+            # 构建映射关系，跳过空的或者"请选择渠道ID"这样的默认项
+            self.channel_name_to_value_map = {
+                channel_name: channel_value
+                for channel in channel_groups
+                if (channel_name := channel.get('name', '').strip())
+                and (channel_value := channel.get('value', '').strip())
+                and channel_name != "请选择渠道ID"
+            }
             
             # logger.info(f"构建渠道映射关系完成: {self.channel_name_to_value_map}")
             return self.channel_name_to_value_map
@@ -809,9 +973,12 @@ class ApiDataReader:
             对应的渠道value，如果找不到返回空字符串
         """
         try:
-            # 如果映射关系还没有建立，先建立映射关系
-            if not self.channel_name_to_value_map:
-                await self.build_channel_name_to_value_map()
+            # 映射关系未建立或已过期（1小时）时重新建立，加锁保证并发调用只拉取一次
+            if time.monotonic() > self._map_expiry:
+                async with self._map_lock:
+                    if time.monotonic() > self._map_expiry:
+                        if await self.build_channel_name_to_value_map():
+                            self._map_expiry = time.monotonic() + 3600
             
             channel_value = self.channel_name_to_value_map.get(channel_name, '')
             if channel_value:
@@ -878,7 +1045,40 @@ class ApiDataReader:
             channel_names=channel_names
         )
 
+# Telegram 发送限制：全局约 30 条/秒，单个群组约 20 条/分钟。
+# 全局额度与消息转发共用 utils.global_rate_limiter；单群组限速器按 chat_id 放在模块级，
+# 因为 ApiDataSender 会按需多次创建
+_CHAT_SEND_LIMITERS: Dict[int, RateLimiter] = {}
+# 单群组限速器数量超过该值时，清理令牌已补满（近期未发送）的限速器
+_CHAT_LIMITERS_MAX = 256
+
+
+def _chat_send_limiter(chat_id: int) -> RateLimiter:
+    """获取群组的发送限速器（约 20 条/分钟），不存在时创建"""
+    limiter = _CHAT_SEND_LIMITERS.get(chat_id)
+    if limiter is None:
+        if len(_CHAT_SEND_LIMITERS) >= _CHAT_LIMITERS_MAX:
+            for idle_chat_id in [cid for cid, lim in _CHAT_SEND_LIMITERS.items() if lim.is_idle()]:
+                del _CHAT_SEND_LIMITERS[idle_chat_id]
+        limiter = _CHAT_SEND_LIMITERS[chat_id] = RateLimiter(20, period=60.0)
+    return limiter
+# 遇到 RetryAfter 时的最大重试次数
+_SEND_MAX_RETRIES = 3
+
+# 群组汇总消息的日期头部模板和表格头部（使用" - "分隔，便于复制）
+_HEADER_FMT = "📅 日期：{}\n\n".format
+_TABLE_HEADER = "渠道号 - 新增 - 付费人数 - 付费金额 - 总充 - 总提 - 充提差\n"
+
+
+class GroupTarget(NamedTuple):
+    """数据发送的目标群组"""
+    chat_id: int
+    group_name: str
+
+
 class ApiDataSender:
+    __slots__ = ('bot', 'config_loader', '_channel_index_cache')
+    
     def __init__(self, bot, config_loader=None):
         """初始化数据发送器
         
@@ -889,9 +1089,8 @@ class ApiDataSender:
         self.bot = bot
         self.config_loader = config_loader
         
-        # 发送配置
-        self.batch_size = 5  # 每批发送的群组数量
-        self.delay_seconds = 2  # 批次间的延迟时间（秒）
+        # 渠道ID -> [GroupTarget] 的反向索引，与构建时的群组列表一起缓存
+        self._channel_index_cache: Optional[tuple] = None
         
     
     def update_config(self, config_loader):
@@ -901,9 +1100,89 @@ class ApiDataSender:
             config_loader: 新的配置加载器实例
         """
         self.config_loader = config_loader
+        self._channel_index_cache = None
+        self._get_channel_index()
         logger.info("ApiDataSender 配置已更新")
     
-    async def format_message(self, data: Dict[str, Any]) -> str:
+    def _get_channel_index(self) -> Dict[str, List[GroupTarget]]:
+        """获取渠道ID到目标群组的反向索引
+        
+        与 ApiDataReader._get_target_channels 相同，以 get_groups_ordered() 返回的
+        列表对象作为版本标识，配置未变时直接复用；tg_group 在建索引时即转换为 int。
+        
+        Returns:
+            {渠道ID: [GroupTarget, ...]}
+        """
+        groups_ordered = self.config_loader.get_groups_ordered()
+        cache = self._channel_index_cache
+        if cache is None or cache[0] is not groups_ordered:
+            channel_index: Dict[str, List[GroupTarget]] = {}
+            for group_name, group_config in groups_ordered:
+                tg_group = group_config.get('tg_group', '')
+                if not tg_group:
+                    continue
+                try:
+                    chat_id = int(tg_group)
+                except (TypeError, ValueError):
+                    logger.warning(f"群组 {group_name} 的 tg_group 无效: {tg_group}")
+                    continue
+                target = GroupTarget(chat_id, group_config.get('name', group_name))
+                seen = set()
+                for channel_config in group_config.get('channel_ids', []):
+                    channel_id = channel_config.get('id', '')
+                    if channel_id and channel_id not in seen:
+                        seen.add(channel_id)
+                        channel_index.setdefault(channel_id, []).append(target)
+            cache = self._channel_index_cache = (groups_ordered, channel_index)
+        return cache[1]
+    
+    async def _send_message(self, chat_id: int, text: str):
+        """按 Telegram 限速发送一条消息，遇到 RetryAfter 时等待指定时间后重试
+        
+        Args:
+            chat_id: 目标群组ID
+            text: 消息文本
+        """
+        for attempt in range(_SEND_MAX_RETRIES + 1):
+            await _chat_send_limiter(chat_id).acquire()
+            await global_rate_limiter.acquire()
+            try:
+                return await self.bot.send_message(chat_id=chat_id, text=text)
+            except RetryAfter as e:
+                if attempt >= _SEND_MAX_RETRIES:
+                    raise
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                logger.warning(f"发送到群组 {chat_id} 触发限流，{retry_after} 秒后重试")
+                await asyncio.sleep(retry_after)
+    
+    @staticmethod
+    async def _send_to_groups(targets: List[GroupTarget], send_one) -> int:
+        """并发发送到所有目标群组，发送节奏由 _send_message 中的限速器控制
+        
+        单个群组失败只记录日志，不会取消其他群组的发送。
+        
+        Args:
+            targets: 目标群组列表
+            send_one: 协程函数 send_one(chat_id, group_name)，负责向单个群组发送
+            
+        Returns:
+            发送成功的群组数量
+        """
+        results = await asyncio.gather(
+            *(send_one(chat_id, group_name) for chat_id, group_name in targets),
+            return_exceptions=True
+        )
+        sent = 0
+        for (chat_id, group_name), result in zip(targets, results):
+            if isinstance(result, BaseException):
+                logger.error(f"发送到群组 {group_name} ({chat_id}) 时出错: {str(result)}")
+            else:
+                sent += 1
+        return sent
+    
+    def format_message(self, data: Dict[str, Any]) -> str:
         """格式化消息内容
         
         Args:
@@ -930,16 +1209,16 @@ class ApiDataSender:
             charge_withdraw_diff = data.get('charge_withdraw_diff', '0')
             
             # 格式化消息
-            message = f"日期：{create_time}\n"
-            message += f"渠道：{channel}\n"
-            message += f"新增：{register}\n"
-            message += f"付费人数：{new_charge_user}\n"
-            message += f"付费金额：{new_charge}\n"
-            message += f"总充：{charge_total}\n"
-            message += f"总提：{withdraw_total}\n"
-            message += f"充提差：{charge_withdraw_diff}"
-            
-            return message
+            return (
+                f"日期：{create_time}\n"
+                f"渠道：{channel}\n"
+                f"新增：{register}\n"
+                f"付费人数：{new_charge_user}\n"
+                f"付费金额：{new_charge}\n"
+                f"总充：{charge_total}\n"
+                f"总提：{withdraw_total}\n"
+                f"充提差：{charge_withdraw_diff}"
+            )
             
         except Exception as e:
             logger.error(f"格式化消息时出错: {str(e)}")
@@ -957,7 +1236,7 @@ class ApiDataSender:
         try:
             # 获取渠道来源
             channel_source = data.get('channel', '')
-            logger.info(f"从数据中获取到的渠道来源: {channel_source}")
+            logger.info("从数据中获取到的渠道来源: %s", channel_source)
             
             if not channel_source:
                 logger.warning("数据中没有渠道来源信息")
@@ -968,56 +1247,30 @@ class ApiDataSender:
                 logger.error("配置加载器未初始化")
                 return False
             
-            # 获取所有群组配置
-            groups_config = self.config_loader.get_groups_config()
-            if not groups_config:
+            # 通过反向索引查找包含该渠道的群组
+            channel_index = self._get_channel_index()
+            if not channel_index:
                 logger.warning("未找到群组配置")
                 return False
             
-            # 查找包含该渠道的群组
-            target_groups = []
-            for group_name, group_config in groups_config.items():
-                channel_ids = group_config.get('channel_ids', [])
-                for channel_config in channel_ids:
-                    channel_id = channel_config.get('id', '')
-                    if channel_id == channel_source:
-                        tg_group = group_config.get('tg_group', '')
-                        if tg_group:
-                            target_groups.append({
-                                'group_name': group_config.get('name', group_name),
-                                'tg_group': tg_group
-                            })
-                        break
+            target_groups = channel_index.get(channel_source, [])
             
             if not target_groups:
                 logger.warning(f"没有为渠道来源 '{channel_source}' 配置目标群组")
                 return False
             
             # 格式化单条数据消息
-            single_message = await self.format_message(data)
-            logger.info(f"格式化后的单条消息内容: {single_message}")
+            single_message = self.format_message(data)
+            logger.info("格式化后的单条消息内容: %s", single_message)
             
-            # 使用配置的发送间隔参数
-            total_sent = 0
+            async def send_one(chat_id: int, group_name: str):
+                await self._send_message(chat_id, single_message)
+                logger.info("已发送单条数据到群组 %s (%s)", group_name, chat_id)
             
-            logger.info(f"使用发送间隔配置: 每 {self.batch_size} 个群组间隔 {self.delay_seconds} 秒")
+            total_sent = await self._send_to_groups(target_groups, send_one)
             
-            for i, group_info in enumerate(target_groups):
-                chat_id = int(group_info['tg_group'])
-                group_name = group_info['group_name']
-                
-                # 发送单条数据消息
-                await self.bot.send_message(chat_id=chat_id, text=single_message)
-                total_sent += 1
-                logger.info(f"已发送单条数据到群组 {group_name} ({chat_id})，当前批次: {i % self.batch_size + 1}/{min(self.batch_size, len(target_groups) - (i // self.batch_size) * self.batch_size)}")
-                
-                # 每发送batch_size个群组后暂停delay_seconds秒，但最后一批不需要暂停
-                if (i + 1) % self.batch_size == 0 and i + 1 < len(target_groups):
-                    logger.info(f"已发送 {self.batch_size} 个群组，暂停 {self.delay_seconds} 秒")
-                    await asyncio.sleep(self.delay_seconds)
-            
-            logger.info(f"发送完成，共发送到 {total_sent} 个群组")
-            return True
+            logger.info("发送完成，共发送到 %d 个群组", total_sent)
+            return total_sent > 0
         except Exception as e:
             logger.error(f"发送数据时出错: {str(e)}")
             return False
@@ -1041,76 +1294,61 @@ class ApiDataSender:
                 logger.error("配置加载器未初始化")
                 return False
             
-            groups_config = self.config_loader.get_groups_config()
-            if not groups_config:
+            channel_index = self._get_channel_index()
+            if not channel_index:
                 logger.warning("未找到群组配置")
                 return False
             
-            # 按群组汇总数据
-            group_data_map = {}
+            # 按群组汇总数据（以 chat_id 为键），targets 按首次匹配的顺序记录目标群组
+            group_data_map: Dict[int, List[Dict[str, Any]]] = {}
+            targets: List[GroupTarget] = []
             
             for data in data_list:
                 channel_source = data.get('channel', '')
                 if not channel_source:
                     continue
                 
-                # 查找包含该渠道的群组
-                for group_name, group_config in groups_config.items():
-                    channel_ids = group_config.get('channel_ids', [])
-                    for channel_config in channel_ids:
-                        channel_id = channel_config.get('id', '')
-                        if channel_id == channel_source:
-                            tg_group = group_config.get('tg_group', '')
-                            if tg_group:
-                                if tg_group not in group_data_map:
-                                    group_data_map[tg_group] = {
-                                        'group_name': group_config.get('name', group_name),
-                                        'data_list': []
-                                    }
-                                group_data_map[tg_group]['data_list'].append(data)
-                            break
+                for target in channel_index.get(channel_source, ()):
+                    bucket = group_data_map.get(target.chat_id)
+                    if bucket is None:
+                        bucket = group_data_map[target.chat_id] = []
+                        targets.append(target)
+                    bucket.append(data)
             
             if not group_data_map:
                 logger.warning("没有找到匹配的群组配置")
                 return False
             
             # 发送汇总数据到每个群组
-            total_sent = 0
             total_groups = len(group_data_map)
             
-            logger.info(f"准备向 {total_groups} 个群组发送汇总数据")
+            logger.info("准备向 %d 个群组发送汇总数据", total_groups)
             
-            for i, (tg_group, group_info) in enumerate(group_data_map.items()):
-                chat_id = int(tg_group)
-                group_name = group_info['group_name']
-                data_list = group_info['data_list']
+            async def send_one(chat_id: int, group_name: str):
+                group_list = group_data_map[chat_id]
                 
-                logger.info(f"处理群组 {group_name} ({chat_id})，包含 {len(data_list)} 条数据")
+                logger.info("处理群组 %s (%s)，包含 %d 条数据", group_name, chat_id, len(group_list))
                 
                 # 生成汇总消息（文本表格格式）
-                messages = await self._generate_grouped_messages(data_list, group_name)
+                messages = self._generate_grouped_messages(group_list, group_name)
                 
-                # 发送消息
+                # 同一群组内的消息按顺序发送，保证分段顺序
                 for j, message in enumerate(messages):
-                    await self.bot.send_message(chat_id=chat_id, text=message)
-                    logger.info(f"已发送第 {j + 1}/{len(messages)} 条消息到群组 {group_name}")
-                
-                total_sent += 1
-                logger.info(f"群组 {group_name} 发送完成，共 {len(messages)} 条消息")
+                    await self._send_message(chat_id, message)
+                    logger.info("已发送第 %d/%d 条消息到群组 %s", j + 1, len(messages), group_name)
                 
-                # 每发送batch_size个群组后暂停delay_seconds秒，但最后一批不需要暂停
-                if (i + 1) % self.batch_size == 0 and i + 1 < total_groups:
-                    logger.info(f"已发送 {self.batch_size} 个群组，暂停 {self.delay_seconds} 秒")
-                    await asyncio.sleep(self.delay_seconds)
+                logger.info("群组 %s 发送完成，共 %d 条消息", group_name, len(messages))
             
-            logger.info(f"汇总发送完成，共发送到 {total_sent} 个群组")
-            return True
+            total_sent = await self._send_to_groups(targets, send_one)
+            
+            logger.info("汇总发送完成，共发送到 %d 个群组", total_sent)
+            return total_sent > 0
             
         except Exception as e:
             logger.error(f"发送汇总数据时出错: {str(e)}")
             return False
     
-    async def _generate_grouped_messages(self, data_list: List[Dict[str, Any]], group_name: str) -> List[str]:
+    def _generate_grouped_messages(self, data_list: List[Dict[str, Any]], group_name: str) -> List[str]:
         """生成群组汇总消息，格式为表格形式，支持一键复制
         
         Args:
@@ -1128,52 +1366,58 @@ class ApiDataSender:
             report_date = data_list[0].get('create_time', '')
             
             # 生成消息头部（日期部分）
-            header = f"📅 日期：{report_date}\n\n"
+            header = _HEADER_FMT(report_date)
             
             # 生成表格头部（使用空格分隔，便于复制）
-            table_header = "渠道号 - 新增 - 付费人数 - 付费金额 - 总充 - 总提 - 充提差\n"
+            table_header = _TABLE_HEADER
             
             # 生成表格数据行
             table_rows = []
             for data in data_list:
-                channel = data.get('channel', '')
-                register = data.get('register', '0')
-                new_charge_user = data.get('new_charge_user', 0)
-                new_charge = data.get('new_charge', '0')
-                charge_total = data.get('charge_total', '0')
-                withdraw_total = data.get('withdraw_total', '0')
-                charge_withdraw_diff = data.get('charge_withdraw_diff', '0')
+                g = data.get
+                channel, register, new_charge_user, new_charge, charge_total, withdraw_total, charge_withdraw_diff = (
+                    g('channel', ''), g('register', '0'), g('new_charge_user', 0), g('new_charge', '0'),
+                    g('charge_total', '0'), g('withdraw_total', '0'), g('charge_withdraw_diff', '0')
+                )
                 
                 # 格式化数据行（使用空格分隔）
-                row = f"{channel} - {register} - {new_charge_user} - {new_charge} - {charge_total} - {withdraw_total} - {charge_withdraw_diff}"
+                row = " - ".join((
+                    str(channel), str(register), str(new_charge_user), str(new_charge),
+                    str(charge_total), str(withdraw_total), str(charge_withdraw_diff)
+                ))
                 table_rows.append(row)
             
-            # 组合完整消息
-            full_message = header + table_header + "\n".join(table_rows)
-            
-            # 检查消息长度，如果超过4000字符则分割
-            if len(full_message) <= 4000:
-                return [full_message]
+            # 先按各部分长度计算完整消息的长度，未超过4000字符时才拼接完整消息
+            base_len = len(header) + len(table_header)
+            rows_len = sum(map(len, table_rows)) + max(0, len(table_rows) - 1)
+            if base_len + rows_len <= 4000:
+                return [header + table_header + "\n".join(table_rows)]
             else:
-                # 如果超过4000字符，需要分割
+                # 如果超过4000字符，需要分割；只累计行列表和长度，满一条时再拼接
                 messages = []
-                current_message = header + table_header
+                prefix = header + table_header
+                prefix_len = len(prefix)
+                # 保持原有格式：第一条消息的表头与首行之间空一行，后续消息表头后直接接数据行
+                lead = "\n"
+                current_rows: List[str] = []
+                current_len = prefix_len
                 
                 for row in table_rows:
-                    # 检查添加这一行是否会超过4000字符
-                    if len(current_message + "\n" + row) > 4000:
+                    # 检查添加这一行（含换行符）是否会超过4000字符
+                    if current_rows and current_len + len(row) + 1 > 4000:
                         # 当前消息已满，保存并开始新消息
-                        messages.append(current_message)
-                        current_message = header + table_header + row
-                    else:
-                        # 添加到当前消息
-                        current_message += "\n" + row
+                        messages.append(prefix + lead + "\n".join(current_rows))
+                        lead = ""
+                        current_rows = []
+                        current_len = prefix_len
+                    current_len += len(row) + (1 if current_rows or lead else 0)
+                    current_rows.append(row)
                 
                 # 添加最后一条消息
-                if current_message != header + table_header:
-                    messages.append(current_message)
+                if current_rows:
+                    messages.append(prefix + lead + "\n".join(current_rows))
                 
-                logger.info(f"为群组 {group_name} 生成了 {len(messages)} 条消息")
+                logger.info("为群组 %s 生成了 %d 条消息", group_name, len(messages))
                 return messages
             
         except Exception as e:
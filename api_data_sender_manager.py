@@ -1,14 +1,14 @@
 import asyncio
 import logging
-from datetime import datetime, time, timedelta
+from datetime import datetime, time, timedelta, timezone
 from typing import Dict, List, Any, Optional
-import pytz
 
 from telegram import Bot
 from api_data_reader import ApiDataReader, ApiDataSender
 from scheduler import Scheduler
 from config_loader import ConfigLoader
 from google_sheets_writer import GoogleSheetsWriter
+from utils import INDIA_TZ
 
 logger = logging.getLogger(__name__)
 
@@ -50,13 +50,16 @@ class ApiDataSenderManager:
     async def stop(self):
         """停止管理器"""
         await self.scheduler.stop()
+        # 关闭 API 数据读取器复用的 HTTP 会话
+        await self.api_reader.aclose()
         logger.info("API 数据发送管理器已停止")
     
-    def update_config(self, config_loader):
+    def update_config(self, config_loader, sheets_writer: Optional[GoogleSheetsWriter] = None):
         """更新配置加载器
         
         Args:
             config_loader: 新的配置加载器实例
+            sheets_writer: 已按新配置创建好的Google表格写入器，未提供时在此创建
         """
         self.config_loader = config_loader
         # 更新现有 API 数据读取器的配置，而不是重新创建实例
@@ -65,7 +68,7 @@ class ApiDataSenderManager:
         self.data_sender = ApiDataSender(self.bot, self.config_loader)
         
         # 重新初始化Google表格写入器
-        self.sheets_writer = GoogleSheetsWriter(self.config_loader)
+        self.sheets_writer = sheets_writer or GoogleSheetsWriter(self.config_loader)
         logger.info("ApiDataSenderManager 配置已更新")
     
     def _setup_tasks(self):
@@ -108,17 +111,17 @@ class ApiDataSenderManager:
                     return
                 
                 # 将印度时区时间转换为UTC时间
-                india_tz = pytz.timezone('Asia/Kolkata')
-                utc_tz = pytz.UTC
+                india_tz = INDIA_TZ
+                utc_tz = timezone.utc
                 
                 # 创建印度时区的datetime对象
-                india_time = india_tz.localize(datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0))
+                india_time = datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0, tzinfo=india_tz)
                 # 转换为UTC时间
                 utc_time = india_time.astimezone(utc_tz)
                 
                 logger.info(f"配置的印度时区时间: {hour:02d}:{minute:02d}")
                 logger.info(f"转换后的UTC时间: {utc_time.hour:02d}:{utc_time.minute:02d}")
-                logger.info(f"当前UTC时间: {datetime.now(pytz.UTC).strftime('%Y-%m-%d %H:%M:%S')}")
+                logger.info(f"当前UTC时间: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}")
                 
                 self.scheduler.add_daily_task(
                     'api_daily_report',
@@ -142,7 +145,7 @@ class ApiDataSenderManager:
             logger.info(f"开始处理 API 时报数据，报表类型: {report_type}")
             
             # 获取印度时区的当前日期
-            india_tz = pytz.timezone('Asia/Kolkata')
+            india_tz = INDIA_TZ
             india_now = datetime.now(india_tz)
             today = india_now.strftime('%Y-%m-%d')
             logger.info(f"印度时区当前日期: {today}")
@@ -173,7 +176,7 @@ class ApiDataSenderManager:
             logger.info(f"开始处理 API 日报数据，报表类型: {report_type}")
             
             # 获取印度时区的昨天日期（日报发送昨天的数据）
-            india_tz = pytz.timezone('Asia/Kolkata')
+            india_tz = INDIA_TZ
             india_now = datetime.now(india_tz)
             india_yesterday = india_now - timedelta(days=1)
             yesterday = india_yesterday.strftime('%Y-%m-%d')
@@ -213,28 +216,7 @@ class ApiDataSenderManager:
                 return
             
             # 按群组分组数据
-            group_data_map = {}
-            for data in data_list:
-                channel_source = data.get('channel', '')
-                if not channel_source:
-                    continue
-                
-                # 查找包含该渠道的群组
-                for group_name, group_config in groups_config.items():
-                    channel_ids = group_config.get('channel_ids', [])
-                    for channel_config in channel_ids:
-                        channel_id = channel_config.get('id', '')
-                        if channel_id == channel_source:
-                            # 检查是否有Google表格配置
-                            spreadsheet_id = self.config_loader.get_group_spreadsheet_id(group_name)
-                            if spreadsheet_id:
-                                if group_name not in group_data_map:
-                                    group_data_map[group_name] = {
-                                        'config': group_config,
-                                        'data_list': []
-                                    }
-                                group_data_map[group_name]['data_list'].append(data)
-                            break
+            group_data_map = self._group_data_for_sheets(groups_config, data_list)
             
             # 写入每个群组的数据
             for group_name, group_info in group_data_map.items():
@@ -266,6 +248,42 @@ class ApiDataSenderManager:
         except Exception as e:
             logger.error(f"写入日报数据到Google表格时出错: {str(e)}")
     
+    def _group_data_for_sheets(self, groups_config: Dict[str, Any], data_list: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """将数据按配置了Google表格的群组分组
+        
+        先为每个配置了表格的群组计算一次渠道ID集合，按数据逐条匹配时只需做集合查找。
+        
+        Args:
+            groups_config: 群组配置
+            data_list: 数据列表
+            
+        Returns:
+            {群组名称: {'config': 群组配置, 'data_list': [...]}}
+        """
+        sheet_groups = []
+        for group_name, group_config in groups_config.items():
+            if self.config_loader.get_group_spreadsheet_id(group_name):
+                id_set = {channel_config.get('id', '') for channel_config in group_config.get('channel_ids', [])}
+                id_set.discard('')
+                sheet_groups.append((group_name, group_config, id_set))
+        
+        group_data_map = {}
+        for data in data_list:
+            channel_source = data.get('channel', '')
+            if not channel_source:
+                continue
+            
+            # 查找包含该渠道的群组
+            for group_name, group_config, id_set in sheet_groups:
+                if channel_source in id_set:
+                    if group_name not in group_data_map:
+                        group_data_map[group_name] = {
+                            'config': group_config,
+                            'data_list': []
+                        }
+                    group_data_map[group_name]['data_list'].append(data)
+        return group_data_map
+    
     async def _write_hourly_data_to_sheets(self, data_list: List[Dict[str, Any]]):
         """将时报数据写入Google表格
         
@@ -284,28 +302,7 @@ class ApiDataSenderManager:
                 return
             
             # 按群组分组数据
-            group_data_map = {}
-            for data in data_list:
-                channel_source = data.get('channel', '')
-                if not channel_source:
-                    continue
-                
-                # 查找包含该渠道的群组
-                for group_name, group_config in groups_config.items():
-                    channel_ids = group_config.get('channel_ids', [])
-                    for channel_config in channel_ids:
-                        channel_id = channel_config.get('id', '')
-                        if channel_id == channel_source:
-                            # 检查是否有Google表格配置
-                            spreadsheet_id = self.config_loader.get_group_spreadsheet_id(group_name)
-                            if spreadsheet_id:
-                                if group_name not in group_data_map:
-                                    group_data_map[group_name] = {
-                                        'config': group_config,
-                                        'data_list': []
-                                    }
-                                group_data_map[group_name]['data_list'].append(data)
-                            break
+            group_data_map = self._group_data_for_sheets(groups_config, data_list)
             
             # 写入每个群组的数据
             for group_name, group_info in group_data_map.items():
@@ -351,7 +348,7 @@ class ApiDataSenderManager:
                 return False
             
             # 获取印度时区的当前时间
-            india_tz = pytz.timezone('Asia/Kolkata')
+            india_tz = INDIA_TZ
             india_now = datetime.now(india_tz)
             current_time = india_now.strftime('%Y-%m-%d %H:%M:%S')
             
@@ -395,7 +392,7 @@ class ApiDataSenderManager:
                 return False
             
             # 获取印度时区的当前时间
-            india_tz = pytz.timezone('Asia/Kolkata')
+            india_tz = INDIA_TZ
             india_now = datetime.now(india_tz)
             current_time = india_now.strftime('%Y-%m-%d %H:%M:%S')
             
@@ -10,6 +10,7 @@
 # -------------------------------
 
 import os
+import threading
 import yaml
 from config_loader import ConfigLoader
 from api_client import ApiClient
@@ -20,6 +21,9 @@ import json
 
 class AuthManager:
     _token_cache = {}
+    # 按 (base_url, 是否校验SSL) 共享的 API 客户端，复用其会话和连接池
+    _clients = {}
+    _clients_lock = threading.Lock()
     
     def __init__(self, config_loader=None):
         """初始化认证管理器
@@ -29,6 +33,22 @@ class AuthManager:
         """
         self.config_loader = config_loader or ConfigLoader()
         
+    @staticmethod
+    def _get_client(base_url: str, config: dict) -> ApiClient:
+        """获取共享的 API 客户端，不存在时创建
+        
+        请求头由每次请求单独传入，客户端只与主机和SSL设置相关；
+        请求会在线程池中发出，因此创建时加锁。
+        """
+        key = (base_url, (config.get('api') or {}).get('ssl_verify') is not False)
+        client = AuthManager._clients.get(key)
+        if client is None:
+            with AuthManager._clients_lock:
+                client = AuthManager._clients.get(key)
+                if client is None:
+                    client = AuthManager._clients[key] = ApiClient(base_url=base_url, config=config)
+        return client
+    
     @staticmethod
     def get_token(config_loader=None, user_type: str = 'default') -> str:
         """
@@ -53,13 +73,9 @@ class AuthManager:
         if not login_config:
             raise ValueError("找不到登录配置")
         
-        # 创建 API 客户端
+        # 获取共享的 API 客户端
         base_url = login_config.get('url', '').replace('/api/Login/Login', '')
-        client = ApiClient(
-            base_url=base_url,
-            default_headers={'Content-Type': 'application/json'},
-            config=config
-        )
+        client = AuthManager._get_client(base_url, config)
         
         # 生成TOTP验证码 - 尝试多个时间窗口
         totp_secret = login_config.get('totp_secret', '')
@@ -289,12 +305,8 @@ class AuthManager:
         login_config = config_loader.get_api_login_config()
         base_url = login_config.get('url', '').replace('/api/Login/Login', '')
         
-        # 创建API客户端
-        client = ApiClient(
-            base_url=base_url,
-            default_headers=authenticated_request.get('headers', {}),
-            config=config_loader.config
-        )
+        # 获取共享的API客户端（认证头部随请求传入）
+        client = AuthManager._get_client(base_url, config_loader.config)
         
         # 发送请求
         response = client.send_request(**authenticated_request)
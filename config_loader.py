@@ -2,7 +2,8 @@ import os
 import yaml
 import logging
 import json
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 # 配置日志
@@ -14,6 +15,11 @@ class ConfigLoader:
         self.config_path = config_path
         self.config = self._load_config()
         self.token_file = "token_cache.json"
+        # 按配置顺序排列的 (群组名称, 群组配置) 列表，配置保存或重新加载时失效
+        self._groups_ordered = None
+        # defer_save() 期间 save_config 只生成配置快照，由调用方稍后写入文件
+        self._defer_save = False
+        self._pending_save: Optional[str] = None
         
     def save_token_to_file(self, token: str, expiry_time: float) -> bool:
         """保存token到文件
@@ -296,9 +302,48 @@ class ConfigLoader:
         return config
     
     def save_config(self) -> None:
-        """保存配置到YAML文件"""
-        with open(self.config_path, 'w', encoding='utf-8') as file:
-            yaml.dump(self.config, file, allow_unicode=True)
+        """保存配置到YAML文件
+        
+        在 defer_save() 上下文中只序列化当前配置的快照，不写文件。
+        """
+        self._groups_ordered = None
+        data = yaml.dump(self.config, allow_unicode=True)
+        if self._defer_save:
+            self._pending_save = data
+            return
+        self.write_config_data(data)
+    
+    def write_config_data(self, data: str) -> None:
+        """将序列化后的配置写入YAML文件
+        
+        先写入同目录下的临时文件再用 os.replace 原子替换，
+        避免重新加载配置时读到写了一半的文件。
+        """
+        tmp_path = f"{self.config_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                file.write(data)
+            os.replace(tmp_path, self.config_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    @contextmanager
+    def defer_save(self):
+        """推迟写文件：上下文中的修改只更新内存配置，save_config 生成的快照
+        通过 take_pending_save() 取出，由调用方（如在线程池中）调用 write_config_data 写入
+        """
+        self._defer_save = True
+        try:
+            yield
+        finally:
+            self._defer_save = False
+    
+    def take_pending_save(self) -> Optional[str]:
+        """取出 defer_save() 期间生成的配置快照，没有待写入的修改时返回 None"""
+        data, self._pending_save = self._pending_save, None
+        return data
     
     def get_bot_token(self) -> str:
         """获取机器人Token"""
@@ -327,6 +372,16 @@ class ConfigLoader:
         
         return self.config['groups']
     
+    def get_groups_ordered(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """获取按配置顺序排列的群组列表，供分页直接按索引切片
+        
+        Returns:
+            [(群组名称, 群组配置), ...]，结果会被缓存，调用方不应修改
+        """
+        if self._groups_ordered is None:
+            self._groups_ordered = list(self.get_groups_config().items())
+        return self._groups_ordered
+    
     def get_channel_ids_by_group_id(self, group_id: int) -> List[str]:
         """根据群组ID获取对应的渠道ID列表
         
@@ -399,6 +454,49 @@ class ConfigLoader:
             logger.error(f"添加渠道ID到群组失败: {str(e)}")
             return False
     
+    def add_channel_ids_to_group_bulk(self, group_name: str, channel_ids: List[str]) -> Tuple[int, List[str]]:
+        """向指定群组批量添加渠道ID，只写一次配置文件
+        
+        Args:
+            group_name: 群组名称
+            channel_ids: 渠道ID列表
+            
+        Returns:
+            (成功添加的数量, 添加失败的渠道ID列表)，已存在或重复的渠道ID计为失败
+        """
+        try:
+            groups_config = self.get_groups_config()
+            if group_name not in groups_config:
+                logger.error(f"群组 {group_name} 不存在")
+                return 0, list(channel_ids)
+            
+            group_config = groups_config[group_name]
+            existing_channels = group_config.get('channel_ids', [])
+            existing_ids = {channel.get('id') for channel in existing_channels}
+            
+            added = []
+            failed = []
+            for channel_id in channel_ids:
+                if channel_id in existing_ids:
+                    logger.warning(f"渠道ID {channel_id} 已存在于群组 {group_name} 中")
+                    failed.append(channel_id)
+                    continue
+                existing_ids.add(channel_id)
+                added.append(channel_id)
+            
+            if added:
+                existing_channels.extend({'id': channel_id} for channel_id in added)
+                group_config['channel_ids'] = existing_channels
+                
+                # 保存配置
+                self.save_config()
+                logger.info(f"成功添加 {len(added)} 个渠道ID到群组 {group_name}")
+            return len(added), failed
+            
+        except Exception as e:
+            logger.error(f"批量添加渠道ID到群组失败: {str(e)}")
+            return 0, list(channel_ids)
+    
     def remove_channel_id_from_group(self, group_index: int, channel_id: str) -> bool:
         """从指定群组删除渠道ID
         
@@ -476,6 +574,49 @@ class ConfigLoader:
             logger.error(f"从群组删除渠道ID失败: {str(e)}")
             return False
     
+    def remove_channel_ids_from_group_bulk(self, group_name: str, channel_ids: List[str]) -> Tuple[int, List[str]]:
+        """从指定群组批量删除渠道ID（通过群组名称），只写一次配置文件
+        
+        Args:
+            group_name: 群组名称
+            channel_ids: 要删除的渠道ID列表
+            
+        Returns:
+            (成功删除的数量, 删除失败的渠道ID列表)，群组中不存在的渠道ID计为失败
+        """
+        try:
+            groups_config = self.get_groups_config()
+            
+            if group_name not in groups_config:
+                logger.error(f"群组 {group_name} 不存在")
+                return 0, list(channel_ids)
+            
+            group_config = groups_config[group_name]
+            to_remove = set(channel_ids)
+            remaining = []
+            removed = set()
+            for channel in group_config.get('channel_ids', []):
+                channel_id = channel.get('id')
+                if channel_id in to_remove:
+                    removed.add(channel_id)
+                else:
+                    remaining.append(channel)
+            
+            failed = [channel_id for channel_id in channel_ids if channel_id not in removed]
+            if removed:
+                group_config['channel_ids'] = remaining
+                
+                # 保存配置
+                self.save_config()
+                logger.info(f"成功从群组 {group_name} 删除 {len(removed)} 个渠道ID")
+            if failed:
+                logger.warning(f"在群组 {group_name} 中未找到渠道ID {', '.join(failed)}")
+            return len(removed), failed
+            
+        except Exception as e:
+            logger.error(f"从群组批量删除渠道ID失败: {str(e)}")
+            return 0, list(channel_ids)
+    
     def add_investment_group_config(self, group_name: str, group_id: int) -> bool:
         """添加代投组配置
         
@@ -544,6 +685,7 @@ class ConfigLoader:
         """重新加载配置文件"""
         with open(self.config_path, 'r', encoding='utf-8') as f:
             self.config = yaml.safe_load(f)
+        self._groups_ordered = None
     
     def get_google_sheets_config(self) -> Dict[str, Any]:
         """获取Google表格配置
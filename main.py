@@ -149,8 +149,9 @@ class TelegramForwarderBot:
                 "pageSize": 1000
             }
             
-            # 使用认证管理器发送带认证和验签的请求
-            response = AuthManager.send_authenticated_request(
+            # 使用认证管理器发送带认证和验签的请求（同步 requests 调用，放到线程池中执行避免阻塞事件循环）
+            response = await asyncio.to_thread(
+                AuthManager.send_authenticated_request,
                 endpoint='/api/Package/GetPageList',
                 data=request_data,
                 method='POST',
@@ -188,8 +189,9 @@ class TelegramForwarderBot:
                 "orderBy": "Desc"
             }
             
-            # 使用认证管理器发送带认证和验签的请求
-            response = AuthManager.send_authenticated_request(
+            # 使用认证管理器发送带认证和验签的请求（同步 requests 调用，放到线程池中执行避免阻塞事件循环）
+            response = await asyncio.to_thread(
+                AuthManager.send_authenticated_request,
                 endpoint='/api/RptDataAnalysis/GetPackageAnalysis',
                 data=request_data,
                 method='POST',
@@ -440,6 +442,10 @@ class TelegramForwarderBot:
                 await self.api_data_sender_manager.stop()
                 logger.info("API 数据发送管理器已停止")
             
+            # 关闭用户命令处理器中 API 数据读取器的 HTTP 会话
+            if hasattr(self, 'user_command_handler'):
+                await self.user_command_handler.api_reader.aclose()
+            
             await application.stop()
 
     async def _debug_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -759,5 +765,12 @@ class TelegramForwarderBot:
             await update.message.reply_text(error_message)
 
 if __name__ == "__main__":
+    # 安装了 uvloop 时改用其事件循环（aiohttp 等网络 I/O 吞吐更高），未安装或平台不支持（如 Windows）时使用默认事件循环
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     bot = TelegramForwarderBot()
     asyncio.run(bot.start())
@@ -0,0 +1,153 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+try:
+    import admin_handler
+    from admin_handler import AdminHandler
+    from utils import AdminState
+except ImportError:  # python-telegram-bot / Google API 客户端未安装
+    admin_handler = None
+
+requires_deps = unittest.skipIf(admin_handler is None, "需要安装 python-telegram-bot 和 Google API 客户端")
+
+ADMIN_ID = 1
+
+
+def _handler_mock(name):
+    """带 __name__ 的异步处理函数替身（分发时会记录处理函数名称）"""
+    handler = mock.AsyncMock()
+    handler.__name__ = name
+    return handler
+
+
+def _callback_update(data, user_id=ADMIN_ID):
+    query = SimpleNamespace(
+        data=data, message=None,
+        answer=mock.AsyncMock(), edit_message_text=mock.AsyncMock(),
+    )
+    return SimpleNamespace(
+        callback_query=query,
+        effective_chat=SimpleNamespace(type='private'),
+        effective_user=SimpleNamespace(id=user_id),
+    )
+
+
+@requires_deps
+class AdminHandlerTestCase(unittest.IsolatedAsyncioTestCase):
+    # 分发表在 __init__ 中绑定处理函数，替换需在创建 AdminHandler 之前完成
+    patched_handlers = ()
+
+    def setUp(self):
+        self.handlers = {}
+        for name in self.patched_handlers:
+            patcher = mock.patch.object(AdminHandler, name, _handler_mock(name))
+            self.handlers[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+        config_loader = mock.Mock()
+        config_loader.get_admins.return_value = [ADMIN_ID]
+        self.admin_state = AdminState()
+        self.handler = AdminHandler(config_loader, self.admin_state)
+
+    async def dispatch(self, data, user_id=ADMIN_ID):
+        update = _callback_update(data, user_id)
+        await self.handler.handle_callback_query(update, None)
+        return update.callback_query
+
+
+class CallbackDispatchTest(AdminHandlerTestCase):
+    patched_handlers = ('_handle_add_admin_request', '_handle_set_spreadsheet_request')
+
+    async def test_exact_command(self):
+        query = await self.dispatch('add_admin')
+
+        self.handlers['_handle_add_admin_request'].assert_awaited_once_with(query)
+
+    async def test_string_prefix_command_passes_group_name(self):
+        query = await self.dispatch('set_spreadsheet_group_a')
+
+        self.handlers['_handle_set_spreadsheet_request'].assert_awaited_once_with(query, 'group_a')
+
+    async def test_noop_does_nothing(self):
+        query = await self.dispatch('noop')
+
+        query.edit_message_text.assert_not_awaited()
+
+    async def test_unknown_data_is_reported(self):
+        query = await self.dispatch('no_such_command')
+
+        query.edit_message_text.assert_awaited_once_with("❌ 未知的操作")
+
+    async def test_non_admin_is_rejected(self):
+        query = await self.dispatch('add_admin', user_id=2)
+
+        self.handlers['_handle_add_admin_request'].assert_not_awaited()
+        query.edit_message_text.assert_awaited_once_with("❌ 您没有权限执行此操作")
+
+
+class IntArgCallbackTest(AdminHandlerTestCase):
+    patched_handlers = (
+        '_confirm_delete_channel_id', '_show_channel_ids_for_deletion', '_confirm_delete_channel_group',
+    )
+
+    async def test_single_int_argument(self):
+        query = await self.dispatch('delete_channel_id_3')
+
+        self.handlers['_confirm_delete_channel_id'].assert_awaited_once_with(query, 3)
+        self.handlers['_confirm_delete_channel_group'].assert_not_awaited()
+
+    async def test_two_int_arguments(self):
+        query = await self.dispatch('delete_channel_id_page_0_3')
+
+        self.handlers['_show_channel_ids_for_deletion'].assert_awaited_once_with(query, 0, 3)
+
+    async def test_shorter_command_is_not_shadowed(self):
+        query = await self.dispatch('delete_channel_5')
+
+        self.handlers['_confirm_delete_channel_group'].assert_awaited_once_with(query, 5)
+        self.handlers['_confirm_delete_channel_id'].assert_not_awaited()
+
+    async def test_non_numeric_argument_is_unknown(self):
+        query = await self.dispatch('delete_channel_id_x')
+
+        self.handlers['_confirm_delete_channel_id'].assert_not_awaited()
+        query.edit_message_text.assert_awaited_once_with("❌ 未知的操作")
+
+
+@requires_deps
+class IntInputTest(unittest.TestCase):
+    def test_int_re_accepts_signed_integers_only(self):
+        for text in ('42', '-1001234567890', '+7'):
+            self.assertIsNotNone(admin_handler._INT_RE.fullmatch(text), text)
+        for text in ('', '-', '12a', '1.5', '1 2'):
+            self.assertIsNone(admin_handler._INT_RE.fullmatch(text), text)
+
+
+class TextInputDispatchTest(AdminHandlerTestCase):
+    patched_handlers = ('_handle_add_admin_id_input', '_handle_new_channel_id_input')
+
+    async def send_text(self, text, user_id=ADMIN_ID):
+        update = SimpleNamespace(
+            message=SimpleNamespace(text=text, reply_text=mock.AsyncMock()),
+            effective_user=SimpleNamespace(id=user_id),
+        )
+        await self.handler.handle_admin_message(update, None)
+        return update
+
+    async def test_input_goes_to_waiting_state_handler(self):
+        self.admin_state.set_waiting_for_new_channel_id(ADMIN_ID, 'group_a')
+
+        update = await self.send_text(' c1 ')
+
+        self.handlers['_handle_new_channel_id_input'].assert_awaited_once_with(update, 'c1')
+        self.handlers['_handle_add_admin_id_input'].assert_not_awaited()
+
+    async def test_input_without_waiting_state_is_ignored(self):
+        await self.send_text('42')
+
+        self.handlers['_handle_add_admin_id_input'].assert_not_awaited()
+        self.handlers['_handle_new_channel_id_input'].assert_not_awaited()
+
+
+if __name__ == '__main__':
+    unittest.main()
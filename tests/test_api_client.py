@@ -0,0 +1,86 @@
+import json
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+try:
+    from api_client import ApiClient
+except ImportError:  # requests / urllib3 未安装
+    ApiClient = None
+
+requires_deps = unittest.skipIf(ApiClient is None, "需要安装 requests")
+
+
+def _response(content, content_type, status_code=200):
+    """模拟 requests.Response 中 send_request 用到的属性"""
+    return SimpleNamespace(
+        content=content,
+        headers={'Content-Type': content_type} if content_type else {},
+        status_code=status_code,
+        text=content.decode('utf-8', 'replace'),
+        json=mock.Mock(side_effect=lambda: json.loads(content)),
+    )
+
+
+@requires_deps
+class SendRequestParsingTest(unittest.TestCase):
+    def setUp(self):
+        self.client = ApiClient('https://example.com')
+
+    def send(self, response):
+        with mock.patch.object(self.client.session, 'request', return_value=response):
+            return self.client.send_request('post', '/api/test')
+
+    def test_json_response_is_parsed(self):
+        result = self.send(_response(b'{"code": 0}', 'application/json; charset=utf-8'))
+
+        self.assertEqual(result, {'status_code': 200, 'response': {'code': 0}})
+
+    def test_json_body_with_wrong_content_type_is_parsed(self):
+        result = self.send(_response(b' {"code": 0}', 'text/plain'))
+
+        self.assertEqual(result['response'], {'code': 0})
+        self.assertNotIn('error', result)
+
+    def test_html_response_is_error_without_parsing(self):
+        response = _response(b'<html>502 Bad Gateway</html>', 'text/html', status_code=502)
+
+        result = self.send(response)
+
+        response.json.assert_not_called()
+        self.assertEqual(result['status_code'], 502)
+        self.assertEqual(result['error'], "JSON解析错误: 响应类型为 text/html")
+        self.assertEqual(result['raw_response'], '<html>502 Bad Gateway</html>')
+
+    def test_invalid_json_is_error(self):
+        result = self.send(_response(b'{"code":', 'application/json'))
+
+        self.assertTrue(result['error'].startswith("JSON解析错误: "))
+        self.assertEqual(result['response'], {'message': '响应不是有效的JSON格式'})
+
+    def test_empty_body_is_empty_response(self):
+        response = _response(b'', 'text/html', status_code=204)
+
+        result = self.send(response)
+
+        response.json.assert_not_called()
+        self.assertEqual(result, {'status_code': 204, 'response': {}})
+
+
+@requires_deps
+class RequestDataTest(unittest.TestCase):
+    def test_test_case_keys_are_not_sent(self):
+        client = ApiClient('https://example.com')
+        data = {'casename': '登录', 'expected_code': 0, 'expected': 1, 'username': 'u', 'password': 'p'}
+
+        with mock.patch.object(client.session, 'request',
+                               return_value=_response(b'{}', 'application/json')) as request:
+            client.send_request('post', '/api/Login', data=data)
+
+        self.assertEqual(request.call_args.kwargs['json'], {'expected': 1, 'username': 'u', 'password': 'p'})
+        self.assertEqual(request.call_args.kwargs['method'], 'POST')
+        self.assertIn('casename', data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+try:
+    import pyotp
+    from telegram.error import RetryAfter
+    import api_data_reader
+    from api_data_reader import ApiDataReader, ApiDataSender, GroupTarget
+except ImportError:  # aiohttp / pyotp / python-telegram-bot 未安装
+    api_data_reader = None
+
+requires_deps = unittest.skipIf(api_data_reader is None, "需要安装 aiohttp、pyotp 和 python-telegram-bot")
+
+
+class _GroupsConfig:
+    """只提供 get_groups_ordered() 的配置加载器替身"""
+
+    def __init__(self, groups):
+        self.groups_ordered = list(groups.items())
+
+    def get_groups_ordered(self):
+        return self.groups_ordered
+
+
+class _FakeBot:
+    """前 failures 次发送抛出 RetryAfter，之后记录发送的消息"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RetryAfter(0)
+        self.sent.append((chat_id, text))
+        return text
+
+
+@requires_deps
+class TotpCodesTest(unittest.TestCase):
+    def test_offset_codes_match_pyotp(self):
+        secret = pyotp.random_base32()
+        reader = ApiDataReader('https://example.com/api', '')
+        totp = pyotp.TOTP(secret)
+
+        codes = reader.generate_totp_codes_with_offsets(secret)
+
+        self.assertEqual([c['offset'] for c in codes], [-5, -4, -3, -2, -1, 0, 1, 2])
+        for code_info in codes:
+            self.assertEqual(code_info['code'], totp.at(code_info['timestamp']))
+
+
+@requires_deps
+class LoginTokenPathTest(unittest.TestCase):
+    def test_success_formats(self):
+        self.assertEqual(
+            ApiDataReader._login_token_path({'success': True, 'code': 200, 'data': {'token': 't'}}),
+            ApiDataReader._DATA_TOKEN_PATH)
+        self.assertEqual(
+            ApiDataReader._login_token_path({'code': 0, 'msg': 'Succeed', 'data': {'token': 't'}}),
+            ApiDataReader._DATA_TOKEN_PATH)
+        self.assertEqual(
+            ApiDataReader._login_token_path({'response': {'data': {'token': 't'}}}),
+            ApiDataReader._RESPONSE_TOKEN_PATH)
+
+    def test_failed_login_has_no_token_path(self):
+        self.assertIsNone(ApiDataReader._login_token_path({'success': False, 'code': 200, 'data': {'token': 't'}}))
+        self.assertIsNone(ApiDataReader._login_token_path({'code': 0, 'msg': 'Failed', 'data': {'token': 't'}}))
+        self.assertIsNone(ApiDataReader._login_token_path({'code': 401, 'msg': '验证码错误'}))
+        self.assertIsNone(ApiDataReader._login_token_path({'response': {'data': None}}))
+
+
+@requires_deps
+class ChannelMapTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_lookups_fetch_map_once_until_expiry(self):
+        reader = ApiDataReader('https://example.com/api', '')
+        channel_groups = [
+            {'name': '请选择渠道ID', 'value': '0'},
+            {'name': 'FBA8-18', 'value': '101'},
+            {'name': ' FBPX-35 ', 'value': '102'},
+        ]
+        with mock.patch.object(ApiDataReader, 'get_channel_groups',
+                               mock.AsyncMock(return_value=channel_groups)) as get_channel_groups:
+            values = await asyncio.gather(*(
+                reader.get_channel_value_by_name(name) for name in ('FBA8-18', 'FBPX-35', '请选择渠道ID')
+            ))
+            self.assertEqual(values, ['101', '102', ''])
+            self.assertEqual(get_channel_groups.await_count, 1)
+
+            reader._map_expiry = time.monotonic() - 1
+            self.assertEqual(await reader.get_channel_value_by_name('FBA8-18'), '101')
+            self.assertEqual(get_channel_groups.await_count, 2)
+
+    async def test_empty_map_is_not_cached(self):
+        reader = ApiDataReader('https://example.com/api', '')
+        with mock.patch.object(ApiDataReader, 'get_channel_groups',
+                               mock.AsyncMock(return_value=[])) as get_channel_groups:
+            await reader.get_channel_value_by_name('FBA8-18')
+            await reader.get_channel_value_by_name('FBA8-18')
+
+        self.assertEqual(get_channel_groups.await_count, 2)
+
+
+@requires_deps
+class ChannelIndexTest(unittest.TestCase):
+    def test_index_maps_channels_to_valid_groups(self):
+        loader = _GroupsConfig({
+            'a': {'name': 'Group A', 'tg_group': '-1001', 'channel_ids': [{'id': 'c1'}, {'id': 'c2'}, {'id': 'c1'}]},
+            'b': {'name': 'Group B', 'tg_group': '-1002', 'channel_ids': [{'id': 'c1'}]},
+            'c': {'name': 'No Group', 'tg_group': '', 'channel_ids': [{'id': 'c3'}]},
+            'd': {'name': 'Bad Group', 'tg_group': 'abc', 'channel_ids': [{'id': 'c4'}]},
+        })
+        sender = ApiDataSender(None, loader)
+
+        index = sender._get_channel_index()
+
+        self.assertEqual(index, {
+            'c1': [GroupTarget(-1001, 'Group A'), GroupTarget(-1002, 'Group B')],
+            'c2': [GroupTarget(-1001, 'Group A')],
+        })
+        self.assertIs(sender._get_channel_index(), index)
+
+    def test_index_is_rebuilt_when_groups_change(self):
+        loader = _GroupsConfig({'a': {'tg_group': '-1001', 'channel_ids': [{'id': 'c1'}]}})
+        sender = ApiDataSender(None, loader)
+        sender._get_channel_index()
+
+        loader.groups_ordered = [('a', {'tg_group': '-1001', 'channel_ids': [{'id': 'c2'}]})]
+
+        self.assertEqual(sender._get_channel_index(), {'c2': [GroupTarget(-1001, 'a')]})
+
+
+@requires_deps
+class SendMessageTest(unittest.IsolatedAsyncioTestCase):
+    async def test_retry_after_is_retried(self):
+        bot = _FakeBot(failures=2)
+        sender = ApiDataSender(bot)
+
+        await sender._send_message(-2001, 'hello')
+
+        self.assertEqual(bot.calls, 3)
+        self.assertEqual(bot.sent, [(-2001, 'hello')])
+
+    async def test_retry_after_gives_up_after_max_retries(self):
+        bot = _FakeBot(failures=api_data_reader._SEND_MAX_RETRIES + 1)
+        sender = ApiDataSender(bot)
+
+        with self.assertRaises(RetryAfter):
+            await sender._send_message(-2002, 'hello')
+        self.assertEqual(bot.calls, api_data_reader._SEND_MAX_RETRIES + 1)
+
+    async def test_send_to_groups_counts_successes(self):
+        async def send_one(chat_id, group_name):
+            if chat_id == -2:
+                raise RuntimeError('boom')
+
+        targets = [GroupTarget(-1, 'a'), GroupTarget(-2, 'b'), GroupTarget(-3, 'c')]
+
+        self.assertEqual(await ApiDataSender._send_to_groups(targets, send_one), 2)
+
+
+@requires_deps
+class GroupedMessagesTest(unittest.TestCase):
+    @staticmethod
+    def _data(n, channel_len=8):
+        return [{
+            'create_time': '2025-01-01', 'channel': f"{i:0{channel_len}d}", 'register': i,
+            'new_charge_user': 1, 'new_charge': '10', 'charge_total': '20',
+            'withdraw_total': '5', 'charge_withdraw_diff': '15',
+        } for i in range(n)]
+
+    def test_short_list_is_one_message(self):
+        sender = ApiDataSender(None)
+
+        messages = sender._generate_grouped_messages(self._data(2), 'g')
+
+        self.assertEqual(messages, [
+            api_data_reader._HEADER_FMT('2025-01-01') + api_data_reader._TABLE_HEADER
+            + "00000000 - 0 - 1 - 10 - 20 - 5 - 15\n00000001 - 1 - 1 - 10 - 20 - 5 - 15"
+        ])
+
+    def test_long_list_is_split_under_limit(self):
+        sender = ApiDataSender(None)
+        data = self._data(300, channel_len=20)
+        prefix = api_data_reader._HEADER_FMT('2025-01-01') + api_data_reader._TABLE_HEADER
+
+        messages = sender._generate_grouped_messages(data, 'g')
+
+        self.assertGreater(len(messages), 1)
+        self.assertTrue(all(len(m) <= 4000 for m in messages))
+        self.assertTrue(all(m.startswith(prefix) for m in messages))
+        # 第一条消息表头后空一行，后续消息表头后直接接数据行
+        self.assertTrue(messages[0].startswith(prefix + "\n" + data[0]['channel']))
+        self.assertFalse(messages[1][len(prefix):].startswith("\n"))
+        rows = [row for m in messages for row in m[len(prefix):].strip("\n").split("\n")]
+        self.assertEqual([row.split(" - ")[0] for row in rows], [d['channel'] for d in data])
+
+    def test_empty_list_has_no_messages(self):
+        self.assertEqual(ApiDataSender(None)._generate_grouped_messages([], 'g'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
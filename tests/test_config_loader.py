@@ -0,0 +1,157 @@
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from config_loader import ConfigLoader
+
+
+def _make_config():
+    return {
+        'admins': [1],
+        'groups': {
+            'group_a': {
+                'channel_ids': [{'id': 'c1'}, {'id': 'c2'}],
+                'name': 'Group A',
+                'tg_group': '-1001',
+            },
+            'group_b': {
+                'channel_ids': [{'id': 'c3'}],
+                'name': 'Group B',
+                'tg_group': '-1002',
+            },
+        },
+    }
+
+
+class ConfigLoaderTestCase(unittest.TestCase):
+    """在临时目录中使用真实的 YAML 配置文件"""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.config_path = os.path.join(self._tmpdir.name, 'config.yaml')
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            yaml.dump(_make_config(), f, allow_unicode=True)
+        self.loader = ConfigLoader(self.config_path)
+
+    def read_file_config(self):
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
+
+    def file_channel_ids(self, group_name):
+        return [c['id'] for c in self.read_file_config()['groups'][group_name]['channel_ids']]
+
+
+class BulkChannelIdsTest(ConfigLoaderTestCase):
+    def test_add_bulk_skips_existing_and_duplicate_ids(self):
+        count, failed = self.loader.add_channel_ids_to_group_bulk('group_a', ['c2', 'c4', 'c5', 'c4'])
+
+        self.assertEqual(count, 2)
+        self.assertEqual(failed, ['c2', 'c4'])
+        self.assertEqual(self.file_channel_ids('group_a'), ['c1', 'c2', 'c4', 'c5'])
+
+    def test_add_bulk_unknown_group_fails_all(self):
+        count, failed = self.loader.add_channel_ids_to_group_bulk('missing', ['c1', 'c2'])
+
+        self.assertEqual((count, failed), (0, ['c1', 'c2']))
+
+    def test_add_bulk_without_new_ids_does_not_write(self):
+        mtime = os.stat(self.config_path).st_mtime_ns
+        count, failed = self.loader.add_channel_ids_to_group_bulk('group_a', ['c1'])
+
+        self.assertEqual((count, failed), (0, ['c1']))
+        self.assertEqual(os.stat(self.config_path).st_mtime_ns, mtime)
+
+    def test_remove_bulk_reports_missing_ids(self):
+        count, failed = self.loader.remove_channel_ids_from_group_bulk('group_a', ['c1', 'c9'])
+
+        self.assertEqual((count, failed), (1, ['c9']))
+        self.assertEqual(self.file_channel_ids('group_a'), ['c2'])
+        self.assertEqual(self.file_channel_ids('group_b'), ['c3'])
+
+    def test_remove_bulk_unknown_group_fails_all(self):
+        count, failed = self.loader.remove_channel_ids_from_group_bulk('missing', ['c1'])
+
+        self.assertEqual((count, failed), (0, ['c1']))
+
+
+class SaveConfigTest(ConfigLoaderTestCase):
+    def test_save_replaces_file_without_leaving_tmp(self):
+        self.loader.config['admins'].append(2)
+        self.loader.save_config()
+
+        self.assertEqual(self.read_file_config()['admins'], [1, 2])
+        self.assertFalse(os.path.exists(self.config_path + '.tmp'))
+
+    def test_failed_write_keeps_original_file(self):
+        original = self.read_file_config()
+        # 配置路径是目录时 os.replace 失败，临时文件应被清理且原文件不变
+        bad_path = os.path.join(self._tmpdir.name, 'as_dir')
+        os.mkdir(bad_path)
+        self.loader.config_path = bad_path
+
+        with self.assertRaises(OSError):
+            self.loader.write_config_data('admins: []\n')
+        self.assertFalse(os.path.exists(bad_path + '.tmp'))
+        self.assertEqual(self.read_file_config(), original)
+
+    def test_defer_save_only_snapshots_config(self):
+        with self.loader.defer_save():
+            self.loader.add_channel_ids_to_group_bulk('group_a', ['c4'])
+
+        self.assertEqual(self.file_channel_ids('group_a'), ['c1', 'c2'])
+        data = self.loader.take_pending_save()
+        self.assertIsNotNone(data)
+        self.assertIsNone(self.loader.take_pending_save())
+
+        self.loader.write_config_data(data)
+        self.assertEqual(self.file_channel_ids('group_a'), ['c1', 'c2', 'c4'])
+
+    def test_defer_save_without_changes_has_nothing_pending(self):
+        with self.loader.defer_save():
+            self.loader.add_channel_ids_to_group_bulk('group_a', ['c1'])
+
+        self.assertIsNone(self.loader.take_pending_save())
+
+    def test_save_after_defer_save_writes_again(self):
+        with self.loader.defer_save():
+            pass
+        self.loader.config['admins'] = [3]
+        self.loader.save_config()
+
+        self.assertEqual(self.read_file_config()['admins'], [3])
+        self.assertIsNone(self.loader.take_pending_save())
+
+
+class GroupsOrderedTest(ConfigLoaderTestCase):
+    def test_groups_ordered_follows_config_order_and_is_cached(self):
+        groups = self.loader.get_groups_ordered()
+
+        self.assertEqual([name for name, _ in groups], ['group_a', 'group_b'])
+        self.assertIs(self.loader.get_groups_ordered(), groups)
+
+    def test_save_config_invalidates_groups_ordered(self):
+        groups = self.loader.get_groups_ordered()
+        self.loader.add_investment_group_config('group_c', -1003)
+
+        refreshed = self.loader.get_groups_ordered()
+        self.assertIsNot(refreshed, groups)
+        self.assertEqual([name for name, _ in refreshed], ['group_a', 'group_b', 'group_c'])
+
+    def test_reload_config_invalidates_groups_ordered(self):
+        groups = self.loader.get_groups_ordered()
+        config = self.read_file_config()
+        del config['groups']['group_a']
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            yaml.dump(config, f, allow_unicode=True)
+
+        self.loader.reload_config()
+        refreshed = self.loader.get_groups_ordered()
+        self.assertIsNot(refreshed, groups)
+        self.assertEqual([name for name, _ in refreshed], ['group_b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
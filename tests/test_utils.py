@@ -0,0 +1,66 @@
+import asyncio
+import time
+import unittest
+
+try:
+    import utils
+    from utils import AdminState, RateLimiter
+except ImportError:  # python-telegram-bot 未安装
+    utils = None
+
+requires_deps = unittest.skipIf(utils is None, "需要安装 python-telegram-bot")
+
+
+@requires_deps
+class AdminStateTest(unittest.TestCase):
+    def test_current_state_follows_set_and_clear(self):
+        state = AdminState()
+        self.assertIsNone(state.get_current_state(1))
+
+        state.set_waiting_for_new_channel_id(1, 'group_a')
+        self.assertEqual(state.get_current_state(1), 'waiting_for_new_channel_id')
+        self.assertTrue(state.is_waiting_for_new_channel_id(1))
+        self.assertIsNone(state.get_current_state(2))
+
+        state.set_waiting_for_add_admin_id(1)
+        self.assertEqual(state.get_current_state(1), 'waiting_for_add_admin_id')
+        self.assertFalse(state.is_waiting_for_new_channel_id(1))
+
+        state.clear_state(1)
+        self.assertIsNone(state.get_current_state(1))
+
+
+@requires_deps
+class RateLimiterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_within_capacity_does_not_wait(self):
+        limiter = RateLimiter(max_per_second=5, period=0.1)
+
+        results = [await limiter.acquire() for _ in range(5)]
+
+        self.assertEqual(results, [(True, False)] * 5)
+
+    async def test_waiters_sleep_concurrently_at_configured_rate(self):
+        # 容量 5、每秒补充 50 个令牌：超出的 10 次各自预留令牌，总共约等待 0.2 秒
+        limiter = RateLimiter(max_per_second=5, period=0.1)
+
+        start = time.monotonic()
+        results = await asyncio.gather(*(limiter.acquire() for _ in range(15)))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(sum(waited for _, waited in results), 10)
+        self.assertGreaterEqual(elapsed, 0.18)
+        self.assertLess(elapsed, 0.6)
+
+    async def test_is_idle_after_tokens_refill(self):
+        limiter = RateLimiter(max_per_second=5, period=0.1)
+        self.assertTrue(limiter.is_idle())
+
+        await limiter.acquire()
+        self.assertFalse(limiter.is_idle())
+
+        await asyncio.sleep(0.05)
+        self.assertTrue(limiter.is_idle())
+
+
+if __name__ == '__main__':
+    unittest.main()
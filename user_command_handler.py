@@ -11,7 +11,6 @@
 import logging
 from datetime import datetime, timedelta
 from typing import Optional
-import pytz
 
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -19,6 +18,7 @@ from telegram.ext import ContextTypes
 from config_loader import ConfigLoader
 from api_data_reader import ApiDataReader, ApiDataSender
 from google_sheets_writer import GoogleSheetsWriter
+from utils import INDIA_TZ
 
 logger = logging.getLogger(__name__)
 
@@ -41,24 +41,21 @@ class UserCommandHandler:
         # 初始化Google表格写入器
         self.sheets_writer = GoogleSheetsWriter(self.config_loader)
     
-    def update_config(self, config_loader: ConfigLoader):
+    def update_config(self, config_loader: ConfigLoader, sheets_writer: Optional[GoogleSheetsWriter] = None):
         """更新配置加载器
         
         Args:
             config_loader: 新的配置加载器实例
+            sheets_writer: 已按新配置创建好的Google表格写入器，未提供时在此创建
         """
         self.config_loader = config_loader
         
-        # 重新创建 API 数据读取器实例，避免状态污染
-        logger.info("重新创建ApiDataReader实例以避免状态污染")
-        self.api_reader = ApiDataReader(
-            api_url='',  # 不再使用配置文件中的url
-            api_token='',  # 不再使用配置文件中的token
-            config_loader=self.config_loader
-        )
+        # 更新现有 API 数据读取器的配置，而不是重新创建实例：
+        # 读取器持有复用的 HTTP 会话，重新创建会泄漏旧会话
+        self.api_reader.config_loader = self.config_loader
         
         # 重新创建Google表格写入器
-        self.sheets_writer = GoogleSheetsWriter(self.config_loader)
+        self.sheets_writer = sheets_writer or GoogleSheetsWriter(self.config_loader)
         logger.info("UserCommandHandler 配置已更新")
     
     async def handle_today_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -94,7 +91,7 @@ class UserCommandHandler:
             logger.info(f"群组 {chat_id} 对应的渠道ID列表: {channel_ids}")
             
             # 获取印度时区的当前时间
-            india_tz = pytz.timezone('Asia/Kolkata')
+            india_tz = INDIA_TZ
             india_now = datetime.now(india_tz)
             india_current_time = india_now.strftime('%Y-%m-%d %H:%M:%S')
             india_current_date = india_now.strftime('%Y-%m-%d')
@@ -185,7 +182,7 @@ class UserCommandHandler:
             logger.info(f"群组 {chat_id} 对应的渠道ID列表: {channel_ids}")
             
             # 获取印度时区的当前时间，然后计算昨天
-            india_tz = pytz.timezone('Asia/Kolkata')
+            india_tz = INDIA_TZ
             india_now = datetime.now(india_tz)
             india_yesterday = india_now - timedelta(days=1)
             india_yesterday_date = india_yesterday.strftime('%Y-%m-%d')
@@ -273,7 +270,7 @@ class UserCommandHandler:
             logger.info(f"向群组 {group_name} ({chat_id}) 发送汇总数据")
             
             # 生成汇总消息（文本表格格式）
-            messages = await data_sender._generate_grouped_messages(data_list, group_name)
+            messages = data_sender._generate_grouped_messages(data_list, group_name)
             
             if not messages:
                 logger.warning("生成的汇总消息为空")
@@ -307,7 +304,7 @@ class UserCommandHandler:
                 return False
                 
             # 获取印度时区的当前时间
-            india_tz = pytz.timezone('Asia/Kolkata')
+            india_tz = INDIA_TZ
             india_now = datetime.now(india_tz)
             current_time = india_now.strftime('%Y-%m-%d %H:%M:%S')
             
@@ -338,7 +335,7 @@ class UserCommandHandler:
                 return False
                 
             # 获取印度时区的当前时间
-            india_tz = pytz.timezone('Asia/Kolkata')
+            india_tz = INDIA_TZ
             india_now = datetime.now(india_tz)
             current_time = india_now.strftime('%Y-%m-%d %H:%M:%S')
             
@@ -1,46 +1,63 @@
 import re
 import asyncio
 import time
+from datetime import timedelta, timezone
 from typing import Optional, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from telegram import Update
 
+# 印度时区，各模块共用（标准库 zoneinfo；系统缺少时区数据时退回固定的 UTC+05:30，印度不使用夏令时）
+try:
+    INDIA_TZ = ZoneInfo('Asia/Kolkata')
+except ZoneInfoNotFoundError:
+    INDIA_TZ = timezone(timedelta(hours=5, minutes=30), 'IST')
+
 # 添加全局速率限制器
 class RateLimiter:
-    def __init__(self, max_per_second=25):
+    def __init__(self, max_per_second=25, period=1.0):
+        """令牌桶限速器：每 period 秒最多放行 max_per_second 次（period 默认 1 秒）"""
         self.max_per_second = max_per_second
+        self.period = period
+        self._rate = max_per_second / period  # 每秒补充的令牌数
         self.tokens = max_per_second  # 令牌桶初始容量
-        self.last_token_time = time.time()  # 上次更新令牌的时间
+        self.last_token_time = time.monotonic()  # 上次更新令牌的时间
         self.lock = asyncio.Lock()
         self._task = None
         self._loop = None
     
     async def acquire(self):
-        """获取发送权限，使用令牌桶算法"""
+        """获取发送权限，使用令牌桶算法
+        
+        令牌不足时先在锁内预留一个令牌（令牌数可为负）并算出需要等待的时间，
+        释放锁后再等待，多个等待者各自按预留顺序睡眠，不会排队等同一个睡眠者。
+        """
         async with self.lock:
-            current_time = time.time()
+            current_time = time.monotonic()
             time_passed = current_time - self.last_token_time
             
             # 根据经过的时间添加令牌
-            new_tokens = time_passed * self.max_per_second
+            new_tokens = time_passed * self._rate
             self.tokens = min(self.max_per_second, self.tokens + new_tokens)
             self.last_token_time = current_time
             
-            if self.tokens >= 1:
-                # 有令牌可用
-                self.tokens -= 1
-                return True, False  # 不需要延迟
-            else:
-                # 计算需要等待的时间
-                wait_time = (1 - self.tokens) / self.max_per_second
-                await asyncio.sleep(wait_time)
-                self.tokens = 0
-                self.last_token_time = time.time()
-                return True, True  # 已经等待过，不需要额外延迟
+            # 取走一个令牌；不足时为预留，需要等到令牌补回为止
+            self.tokens -= 1
+            wait_time = -self.tokens / self._rate if self.tokens < 0 else 0
+        
+        if wait_time <= 0:
+            return True, False  # 不需要延迟
+        await asyncio.sleep(wait_time)
+        return True, True  # 已经等待过，不需要额外延迟
+    
+    def is_idle(self) -> bool:
+        """令牌桶是否已补满（近期没有发送，丢弃后重建不会改变限速效果）"""
+        time_passed = time.monotonic() - self.last_token_time
+        return self.tokens + time_passed * self._rate >= self.max_per_second
     
     async def start_async(self):
         """异步方式启动速率限制器"""
         self.tokens = self.max_per_second
-        self.last_token_time = time.time()
+        self.last_token_time = time.monotonic()
     
     async def stop_async(self):
         """异步方式停止速率限制器"""
@@ -86,6 +103,11 @@ class AdminState:
         user_state = self._get_state(user_id)
         return user_state is not None and user_state.get('state') == state
 
+    def get_current_state(self, user_id: int) -> Optional[str]:
+        """获取用户当前所处的状态名称，如 'waiting_for_add_admin_id'，没有状态时返回 None"""
+        user_state = self._get_state(user_id)
+        return user_state.get('state') if user_state is not None else None
+
     def clear_state(self, user_id: int) -> None:
         """清除用户的所有状态"""
         self.states.pop(user_id, None)